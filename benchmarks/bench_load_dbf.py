@@ -0,0 +1,77 @@
+"""
+Benchmark de leitura de DBF: caminho antigo (dbfread, um dict por registro)
+contra o leitor colunar nativo (DBFReader).
+
+Uso:
+    python -m benchmarks.bench_load_dbf data/input/DENGON2647848_00.dbf --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.utils.loaders import FileLoader
+
+
+def _load(file_path, engine):
+    # Silencia prints/tqdm do loader para não poluir a medição
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return FileLoader.load_dbf(file_path, engine=engine)
+
+
+def _measure_time(file_path, engine):
+    start = time.perf_counter()
+    df = _load(file_path, engine)
+    return df, time.perf_counter() - start
+
+
+def _measure_peak(file_path, engine):
+    # Execução separada: o tracemalloc distorce o tempo do caminho com objetos Python
+    tracemalloc.start()
+    _load(file_path, engine)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _same_content(legacy: pd.DataFrame, native: pd.DataFrame) -> bool:
+    if legacy.shape != native.shape or list(legacy.columns) != list(native.columns):
+        return False
+    for col in legacy.columns:
+        left, right = legacy[col], native[col]
+        if pd.api.types.is_datetime64_any_dtype(right):
+            left = pd.to_datetime(left)
+        elif isinstance(right.dtype, pd.BooleanDtype):
+            left = left.astype('boolean')
+        if not left.equals(right.astype(left.dtype) if left.dtype != right.dtype else right):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FileLoader.load_dbf (dbfread x nativo)")
+    parser.add_argument('file', help='Arquivo DBF de entrada')
+    parser.add_argument('--repeat', type=int, default=3, help='Número de repetições por engine')
+    args = parser.parse_args()
+
+    results = {}
+    frames = {}
+    for engine in ('dbfread', 'native'):
+        runs = [_measure_time(args.file, engine) for _ in range(args.repeat)]
+        frames[engine] = runs[-1][0]
+        best = min(r[1] for r in runs)
+        peak = _measure_peak(args.file, engine)
+        rows = len(frames[engine])
+        results[engine] = (best, peak)
+        print(f"{engine:>8}: {best:8.3f}s | {rows / best if best else 0:12,.0f} rows/s | pico {peak / 2**20:8.1f} MiB")
+
+    speedup = results['dbfread'][0] / results['native'][0] if results['native'][0] else float('inf')
+    print(f" -> Speedup: {speedup:.1f}x | Memória: {results['dbfread'][1] / max(results['native'][1], 1):.1f}x menor")
+    print(f" -> Conteúdo idêntico: {_same_content(frames['dbfread'], frames['native'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark da carga de staging: DataFrame.to_sql em lotes, COPY FROM STDIN sequencial e COPY em pipeline
+(codificação do próximo lote sobreposta ao envio; lotes adaptativos se --chunksize não for informado).
+Usa o banco configurado no .env (DB_USER, DB_PASSWORD, DB_HOST, DB_NAME); rode contra um Postgres local.
+
+Uso:
+    python -m benchmarks.bench_staging_load data/input/DENGON2647848_00.dbf --repeat 3
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from sqlalchemy import text
+
+from src.core.sources.dengue import DengueSource
+from src.utils.database import Database
+
+BENCH_TABLE = "bench_staging_load"
+
+
+# Modo medido -> (método, pipeline)
+MODES = {'to_sql': ('to_sql', False), 'copy': ('copy', False), 'pipeline': ('copy', True)}
+
+
+def _measure(df, mode, chunksize):
+    method, pipeline = MODES[mode]
+    # Silencia prints/tqdm do loader para não poluir a medição
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        start = time.perf_counter()
+        Database.load_dataframe(df, BENCH_TABLE, if_exists='replace', chunksize=chunksize, method=method,
+                                workers=1, pipeline=pipeline)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Database.load_dataframe (to_sql x COPY x pipeline)")
+    parser.add_argument('file', help='Arquivo DBF de Dengue usado como massa de dados')
+    parser.add_argument('--repeat', type=int, default=3, help='Número de repetições por método')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Registros por lote (padrão: o de cada modo; adaptativo no pipeline)')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        df = DengueSource().read(args.file)
+    rows = len(df)
+    print(f" -> Massa de teste: {rows} registros, {df.shape[1]} colunas")
+
+    results = {}
+    try:
+        for mode in MODES:
+            best = min(_measure(df, mode, args.chunksize) for _ in range(args.repeat))
+            results[mode] = best
+            print(f"{mode:>8}: {best:8.3f}s | {rows / best if best else 0:12,.0f} rows/s")
+    finally:
+        with Database.get_engine().begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+    speedup = results['to_sql'] / results['copy'] if results['copy'] else float('inf')
+    print(f" -> Speedup COPY: {speedup:.1f}x")
+    if results['pipeline']:
+        print(f" -> Speedup pipeline sobre COPY sequencial: {results['copy'] / results['pipeline']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
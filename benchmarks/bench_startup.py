@@ -0,0 +1,107 @@
+"""
+Tempo de inicialização do CLI: executa main.py com `python -X importtime` em comandos que não precisam
+de pandas/SQLAlchemy (--help e read --inspect) e mede o tempo total de execução e o custo de imports.
+Falha (código 1) se o tempo passar do limite ou se algum módulo pesado for importado nesses comandos.
+
+Uso:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 10 --max-ms 250
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic_sinan import write_synthetic_dbf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependências que os comandos leves não devem carregar
+HEAVY_MODULES = ("pandas", "sqlalchemy", "psycopg2", "dbfread", "pyarrow", "tqdm")
+
+
+def _header_file(workdir):
+    """DBF pequeno só para o read --inspect (o cabeçalho é o mesmo para qualquer tamanho)."""
+    if not os.path.exists(workdir):
+        os.makedirs(workdir)
+    path = os.path.join(workdir, "DENGON_STARTUP.dbf")
+    if not os.path.exists(path):
+        write_synthetic_dbf(path, 1000, prefix="DENGON", seed=0)
+    return path
+
+
+def parse_importtime(stderr):
+    """
+    Lê a saída do -X importtime: retorna o total de imports (ms), os módulos de nível superior
+    com o custo acumulado (ms) e o conjunto de todos os módulos importados.
+    """
+    top_level = {}
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # linha de títulos
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return sum(top_level.values()), top_level, modules
+
+
+def measure(args, repeat):
+    walls, imports = [], []
+    top_level, modules = {}, set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args],
+                                cwd=ROOT, capture_output=True, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"main.py {' '.join(args)} falhou:\n{result.stderr[-2000:]}")
+        total, top_level, modules = parse_importtime(result.stderr)
+        imports.append(total)
+    return {
+        "wall_ms": statistics.median(walls),
+        "import_ms": statistics.median(imports),
+        "top": sorted(top_level.items(), key=lambda item: -item[1])[:5],
+        "heavy": sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES and "." not in m),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do tempo de inicialização do CLI")
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por comando (vale a mediana)')
+    parser.add_argument('--max-ms', type=float, default=300.0,
+                        help='Limite do tempo total (mediana) por comando, em ms (padrão: 300)')
+    parser.add_argument('--workdir', default='./data/bench', help='Diretório do DBF usado no read --inspect')
+    args = parser.parse_args()
+
+    commands = {
+        "--help": ["--help"],
+        "read --inspect": ["read", os.path.abspath(_header_file(args.workdir)), "--inspect"],
+    }
+
+    failures = 0
+    for label, command in commands.items():
+        result = measure(command, args.repeat)
+        flags = []
+        if result["wall_ms"] > args.max_ms:
+            flags.append(f"acima de {args.max_ms:g} ms")
+        if result["heavy"]:
+            flags.append(f"importa {', '.join(result['heavy'])}")
+        failures += bool(flags)
+
+        print(f"{label:<16} total {result['wall_ms']:7.1f} ms | imports {result['import_ms']:7.1f} ms"
+              f"{'  <- ' + '; '.join(flags) if flags else ''}")
+        for name, ms in result["top"]:
+            print(f"   {name:<40} {ms:7.1f} ms")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
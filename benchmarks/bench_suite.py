@@ -0,0 +1,181 @@
+"""
+Suíte de benchmark reprodutível: gera DBFs sintéticos SINAN (benchmarks.synthetic_sinan) em vários tamanhos
+e mede, com a instrumentação do pipeline (RunMetrics), as etapas de leitura (parse), transformação
+(transform.*), deduplicação (dedup), hash e, com --load, a carga no PostgreSQL (db.*).
+O resultado é gravado em JSON (melhor tempo de cada etapa entre as repetições) e pode ser comparado
+com uma execução anterior via --compare.
+
+Banco descartável para --load (as tabelas bench_* são removidas ao final):
+    docker run --rm -d --name dvs-bench -e POSTGRES_PASSWORD=bench -p 55432:5432 postgres:16
+    DB_USER=postgres DB_PASSWORD=bench DB_HOST=localhost:55432 DB_NAME=postgres \\
+        python -m benchmarks.bench_suite --rows 10000 100000 1000000 --load
+Sem Docker, qualquer PostgreSQL local serve (um banco vazio criado só para o benchmark).
+
+Uso:
+    python -m benchmarks.bench_suite --rows 10000 100000 --repeat 3
+    python -m benchmarks.bench_suite --rows 100000 --compare benchmarks/results/suite_anterior.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks.synthetic_sinan import write_synthetic_dbf
+from src.core.factory import SourceFactory
+from src.utils.metrics import RunMetrics
+from src.utils.notification_key import NOTIF_KEY_COLUMN
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _dataset(workdir, prefix, rows, duplicate_rate, seed):
+    """Gera o DBF sintético uma vez por combinação de parâmetros e o reaproveita nas execuções seguintes."""
+    if not os.path.exists(workdir):
+        os.makedirs(workdir)
+    path = os.path.join(workdir, f"{prefix}_BENCH_{rows}_d{duplicate_rate:g}_s{seed}.dbf")
+    if not os.path.exists(path):
+        print(f" -> Gerando {os.path.basename(path)}...")
+        write_synthetic_dbf(f"{path}.tmp", rows, prefix=prefix, duplicate_rate=duplicate_rate, seed=seed)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def _run_once(path, prefix, rows, load_table):
+    """Uma execução completa instrumentada; retorna os registros de etapa (formato StageRecord.to_dict)."""
+    from src.utils.database import Database
+
+    metrics = RunMetrics.start("bench")
+    # Silencia prints/tqdm do pipeline para não poluir a medição
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        with RunMetrics.file_scope(str(rows)):
+            source = SourceFactory.get_source_by_prefix(prefix)
+            df = source.read(path)
+            if load_table:
+                Database.upsert_dataframe(df, load_table, pk_columns=[NOTIF_KEY_COLUMN])
+    metrics.stop()
+    return metrics.report()["stages"]
+
+
+def _drop_tables(table):
+    from sqlalchemy import text
+    from src.utils.database import Database
+
+    with Database.get_engine().begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS staging_{table}"))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment():
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(sizes, prefix, duplicate_rate, seed, repeat, workdir, load):
+    results = []
+    for rows in sizes:
+        path = _dataset(workdir, prefix, rows, duplicate_rate, seed)
+        load_table = f"bench_{prefix.lower()}" if load else None
+        best = {}
+        try:
+            for i in range(repeat):
+                if load_table:
+                    # Cada repetição parte de um destino vazio (só inserts)
+                    _drop_tables(load_table)
+                for record in _run_once(path, prefix, rows, load_table):
+                    current = best.get(record["stage"])
+                    if current is None or record["seconds"] < current["seconds"]:
+                        best[record["stage"]] = record
+        finally:
+            if load_table:
+                _drop_tables(load_table)
+
+        for stage, record in best.items():
+            results.append({"rows": rows, "stage": stage, "seconds": record["seconds"],
+                            "rows_per_second": record["rows_per_second"], "peak_rss_mb": record["peak_rss_mb"]})
+            print(f"{rows:>9} {stage:<22} {record['seconds']:9.3f}s "
+                  f"{record['rows_per_second'] or 0:14,.0f} rows/s")
+    return results
+
+
+def compare(current, baseline_path, threshold):
+    """Compara com uma execução anterior; retorna o número de etapas mais lentas que o limite."""
+    with open(baseline_path) as f:
+        baseline = {(r["rows"], r["stage"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"\nComparação com {baseline_path} (limite {threshold:.2f}x):")
+    for result in current:
+        previous = baseline.get((result["rows"], result["stage"]))
+        if previous is None or not previous["seconds"]:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  <- REGRESSÃO"
+        print(f"{result['rows']:>9} {result['stage']:<22} {previous['seconds']:9.3f}s -> "
+              f"{result['seconds']:9.3f}s ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suíte de benchmark com DBFs sintéticos SINAN")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000],
+                        help='Tamanhos dos arquivos (ex: 10000 100000 1000000 5000000)')
+    parser.add_argument('--prefix', choices=['DENGON', 'CHIKON'], default='DENGON', help='Fonte simulada')
+    parser.add_argument('--duplicate-rate', type=float, default=0.02, help='Fração de chaves duplicadas')
+    parser.add_argument('--seed', type=int, default=0, help='Semente do gerador')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetições por tamanho (vale o melhor tempo)')
+    parser.add_argument('--workdir', default='./data/bench', help='Diretório dos DBFs gerados')
+    parser.add_argument('--load', action='store_true',
+                        help='Inclui a carga no PostgreSQL configurado no .env (use um banco descartável)')
+    parser.add_argument('--output', default=None, help='Arquivo JSON de resultado (padrão: benchmarks/results/)')
+    parser.add_argument('--compare', default=None, help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='Razão de tempo acima da qual a etapa conta como regressão (padrão: 1.10)')
+    args = parser.parse_args()
+
+    started_at = datetime.now()
+    results = run_suite(args.rows, args.prefix, args.duplicate_rate, args.seed, args.repeat, args.workdir, args.load)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"suite_{started_at:%Y%m%d_%H%M%S}.json")
+    if os.path.dirname(output) and not os.path.exists(os.path.dirname(output)):
+        os.makedirs(os.path.dirname(output))
+    with open(output, 'w') as f:
+        json.dump({
+            "started_at": started_at.isoformat(timespec='seconds'),
+            "params": {"rows": args.rows, "prefix": args.prefix, "duplicate_rate": args.duplicate_rate,
+                       "seed": args.seed, "repeat": args.repeat, "load": args.load},
+            "environment": _environment(),
+            "results": results,
+        }, f, indent=2)
+    print(f" -> Resultado: {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
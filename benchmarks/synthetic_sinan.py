@@ -0,0 +1,299 @@
+"""
+Gerador de arquivos DBF sintéticos no formato das extrações SINAN (DENGON/CHIKON).
+Reproduz os tipos de campo do arquivo real (códigos em C, datas em D, contadores em N),
+as codificações de NU_IDADE_N (hora/dia/mês/ano, vazios e inválidos) e uma taxa controlada
+de notificações duplicadas pela chave (ID_AGRAVO, NU_NOTIFIC, NU_ANO).
+A saída é determinística para a mesma semente e é gravada em blocos (memória O(bloco)).
+
+Uso:
+    python -m benchmarks.synthetic_sinan data/bench/DENGON_BENCH.dbf --rows 1000000 --duplicate-rate 0.02
+"""
+import argparse
+import datetime
+import struct
+from dataclasses import dataclass
+from typing import Callable, List
+
+import numpy as np
+
+AGRAVOS = {"DENGON": b"A90", "CHIKON": b"A920"}
+
+# Municípios (IBGE 6 dígitos) e unidades usados na massa: poucos valores, como no arquivo real de um estado
+MUNICIPIOS = [b"%06d" % (220000 + 10 * i) for i in range(1, 225)]
+BAIRROS = [b"CENTRO", b"SAO JOAO", b"PARQUE PIAUI", b"DIRCEU ARCOVERDE", b"MOCAMBINHO", b"SANTA MARIA",
+           b"ITARARE", b"PROMORAR", b"ANGELIM", b"VERMELHA", b"BUENOS AIRES", b"SATELITE", b""]
+
+# Campos de sinais, comorbidades e alarmes: código 1 (sim), 2 (não), 9 (ignorado) ou vazio
+FLAG_FIELDS = [
+    "FEBRE", "MIALGIA", "CEFALEIA", "EXANTEMA", "VOMITO", "NAUSEA", "DOR_COSTAS", "CONJUNTVIT", "ARTRITE",
+    "ARTRALGIA", "PETEQUIA_N", "LEUCOPENIA", "LACO", "DOR_RETRO", "DIABETES", "HEMATOLOG", "HEPATOPAT",
+    "RENAL", "HIPERTENSA", "ACIDO_PEPT", "AUTO_IMUNE", "ALRM_HIPOT", "ALRM_PLAQ", "ALRM_VOM", "ALRM_SANG",
+    "ALRM_HEMAT", "ALRM_ABDOM", "ALRM_LETAR", "ALRM_HEPAT", "ALRM_LIQ", "GRAV_PULSO", "GRAV_CONV",
+    "GRAV_ENCH", "GRAV_INSUF", "GRAV_TAQUI", "GRAV_EXTRE", "GRAV_HIPOT", "GRAV_HEMAT", "GRAV_MELEN",
+    "GRAV_METRO", "GRAV_SANG", "GRAV_AST", "GRAV_MIOC", "GRAV_CONSC", "GRAV_ORGAO", "MANI_HEMOR",
+    "EPISTAXE", "GENGIVO", "METRO", "PETEQUIAS", "HEMATURA", "SANGRAM", "LACO_N", "PLASMATICO",
+    "EVIDENCIA", "CON_FHD", "COMPLICA", "CS_FLXRET", "FLXRECEBI", "MIGRADO_W",
+]
+EXTRA_DATE_FIELDS = ["DT_INVEST", "DT_CHIK_S1", "DT_CHIK_S2", "DT_PRNT", "DT_SORO", "DT_NS1", "DT_VIRAL",
+                     "DT_PCR", "DT_ALRM", "DT_GRAV", "DT_DIGITA"]
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    name: str
+    type: str
+    length: int
+    generate: Callable[["_Block"], np.ndarray]
+    decimals: int = 0
+
+
+class _Block:
+    """Valores compartilhados entre campos de um bloco de registros (datas coerentes, chave...)."""
+
+    def __init__(self, rng, size, first_row, agravo, duplicate_rate, year, calendar):
+        self.rng = rng
+        self.size = size
+        self.agravo = agravo
+        self.year = year
+        self.calendar = calendar
+
+        # NU_NOTIFIC sequencial; as duplicatas repetem o número de um registro anterior
+        notific = np.arange(first_row + 1, first_row + size + 1)
+        dup = rng.random(size) < duplicate_rate
+        dup &= notific > 1
+        notific[dup] = rng.integers(1, notific[dup])
+        self.notific = notific
+
+        # Datas como deslocamento em dias a partir de 1º de janeiro do ano
+        self.dt_notific = rng.integers(0, 365, size)
+        self.dt_sin_pri = self.dt_notific - rng.integers(0, 15, size)
+        self.age_years = np.clip(rng.gamma(2.2, 16.0, size), 0, 105).astype(int)
+        # Menores de 1 ano (~2% das notificações) recebem NU_IDADE_N em hora/dia/mês
+        self.age_years[rng.random(size) < 0.02] = 0
+
+
+# ----------------------------------------------------------------------
+# Formatação vetorizada (bytes com o preenchimento do DBF)
+# ----------------------------------------------------------------------
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """Inteiros não negativos -> array S{width} com zeros à esquerda, sem laço em Python."""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    matrix = ((values.astype(np.int64)[:, None] // powers) % 10 + ord('0')).astype(np.uint8)
+    return np.ascontiguousarray(matrix).view(f'S{width}').ravel()
+
+
+def _vocab(values: List[bytes], width: int, right: bool = False) -> np.ndarray:
+    """Vocabulário com o preenchimento com espaços do DBF (C à esquerda, N à direita)."""
+    padded = [v.rjust(width) if right else v.ljust(width) for v in values]
+    return np.array(padded, dtype=f'S{width}')
+
+
+def _choice(block: _Block, values: List[bytes], width: int, p=None, right: bool = False) -> np.ndarray:
+    vocab = _vocab(values, width, right)
+    return vocab[block.rng.choice(len(vocab), size=block.size, p=p)]
+
+
+def _const(block: _Block, value: bytes, width: int) -> np.ndarray:
+    return np.full(block.size, value.ljust(width), dtype=f'S{width}')
+
+
+def _dates(block: _Block, offsets: np.ndarray, blank_rate: float = 0.0) -> np.ndarray:
+    offsets = np.clip(offsets, -block.calendar.margin, len(block.calendar.dates) - block.calendar.margin - 1)
+    values = block.calendar.dates[offsets + block.calendar.margin]
+    if blank_rate:
+        values = np.where(block.rng.random(block.size) < blank_rate, b" " * 8, values)
+    return values
+
+
+class _Calendar:
+    """Datas (AAAAMMDD) e semanas epidemiológicas (AAAASS) do ano, com margem para trás."""
+
+    def __init__(self, year: int, margin: int = 60):
+        self.margin = margin
+        start = datetime.date(year, 1, 1) - datetime.timedelta(days=margin)
+        days = [start + datetime.timedelta(days=i) for i in range(margin + 400)]
+        self.dates = np.array([d.strftime('%Y%m%d').encode() for d in days], dtype='S8')
+        self.weeks = np.array([self._epi_week(d) for d in days], dtype='S6')
+
+    @staticmethod
+    def _epi_week(day: datetime.date) -> bytes:
+        # Semana epidemiológica: domingo a sábado; a semana 1 contém o primeiro sábado de janeiro
+        for year in (day.year + 1, day.year, day.year - 1):
+            jan1 = datetime.date(year, 1, 1)
+            first_sunday = jan1 - datetime.timedelta(days=(jan1.weekday() + 1) % 7)
+            if jan1.weekday() == 6 or (jan1 - first_sunday).days <= 3:
+                week1 = first_sunday
+            else:
+                week1 = first_sunday + datetime.timedelta(days=7)
+            if day >= week1:
+                return b"%04d%02d" % (year, (day - week1).days // 7 + 1)
+        raise ValueError(day)
+
+
+def _idade(block: _Block) -> np.ndarray:
+    """
+    NU_IDADE_N: tipo (1 hora, 2 dia, 3 mês, 4 ano) seguido do valor em 3 dígitos.
+    Menores de 1 ano aparecem em hora/dia/mês; há vazios e códigos inválidos, como no arquivo real.
+    """
+    rng = block.rng
+    years = block.age_years
+    tipo = np.full(block.size, 4)
+    valor = years.copy()
+    infant = years == 0
+    infant_tipo = rng.choice([1, 2, 3], size=block.size, p=[0.05, 0.25, 0.70])
+    tipo[infant] = infant_tipo[infant]
+    valor[infant] = np.select([infant_tipo == 1, infant_tipo == 2], [rng.integers(1, 24, block.size),
+                                                                      rng.integers(1, 30, block.size)],
+                              rng.integers(1, 12, block.size))[infant]
+    codes = _digits(tipo * 1000 + valor, 4)
+
+    noise = rng.random(block.size)
+    codes = np.where(noise < 0.02, b"    ", codes)
+    codes = np.where((noise >= 0.02) & (noise < 0.025), _vocab([b"5012", b"9999", b"0000"], 4)[
+        rng.integers(0, 3, block.size)], codes)
+    return codes
+
+
+def _nascimento(block: _Block) -> np.ndarray:
+    """DT_NASC coerente com a idade; parte dos registros sem data (só NU_IDADE_N), como no real."""
+    rng = block.rng
+    birth = ((block.year - block.age_years) * 10000 + rng.integers(1, 13, block.size) * 100
+             + rng.integers(1, 29, block.size))
+    return np.where(rng.random(block.size) < 0.3, b" " * 8, _digits(birth, 8))
+
+
+def build_fields(n_fields: int = 150) -> List[FieldSpec]:
+    """Campos na ordem do arquivo: os usados pelas fontes, depois sinais/datas extras e reservas até n_fields."""
+    sexo = [b"M", b"F", b"I"]
+    flag = [b"1", b"2", b"9", b""]
+    flag_p = [0.25, 0.6, 0.05, 0.10]
+
+    def code(values, p=None, width=1):
+        return lambda b: _choice(b, values, width, p)
+
+    fields = [
+        FieldSpec("TP_NOT", "C", 1, lambda b: _const(b, b"2", 1)),
+        FieldSpec("ID_AGRAVO", "C", 4, lambda b: _const(b, b.agravo, 4)),
+        FieldSpec("DT_NOTIFIC", "D", 8, lambda b: _dates(b, b.dt_notific)),
+        FieldSpec("SEM_NOT", "C", 6, lambda b: b.calendar.weeks[b.dt_notific + b.calendar.margin]),
+        FieldSpec("NU_ANO", "C", 4, lambda b: _const(b, b"%d" % b.year, 4)),
+        FieldSpec("SG_UF_NOT", "C", 2, lambda b: _const(b, b"22", 2)),
+        FieldSpec("ID_MUNICIP", "C", 6, lambda b: _choice(b, MUNICIPIOS, 6)),
+        FieldSpec("ID_REGIONA", "C", 4, lambda b: _choice(b, [b"%04d" % i for i in range(1, 12)], 4)),
+        FieldSpec("ID_UNIDADE", "C", 7, lambda b: _digits(b.rng.integers(2300000, 2301500, b.size), 7)),
+        FieldSpec("NU_NOTIFIC", "C", 7, lambda b: _digits(b.notific % 10_000_000, 7)),
+        FieldSpec("DT_SIN_PRI", "D", 8, lambda b: _dates(b, b.dt_sin_pri)),
+        FieldSpec("SEM_PRI", "C", 6, lambda b: b.calendar.weeks[np.clip(b.dt_sin_pri, -b.calendar.margin, None)
+                                                                + b.calendar.margin]),
+        FieldSpec("DT_NASC", "D", 8, _nascimento),
+        FieldSpec("ANO_NASC", "C", 4, lambda b: _digits(b.year - b.age_years, 4)),
+        FieldSpec("NU_IDADE_N", "C", 4, _idade),
+        FieldSpec("CS_SEXO", "C", 1, code(sexo, [0.46, 0.53, 0.01])),
+        FieldSpec("CS_GESTANT", "C", 1, code([b"1", b"2", b"3", b"4", b"5", b"6", b"9"])),
+        FieldSpec("CS_RACA", "C", 1, code([b"1", b"2", b"3", b"4", b"5", b"9"], [0.2, 0.08, 0.01, 0.6, 0.01, 0.1])),
+        FieldSpec("CS_ESCOL_N", "C", 2, code([b"01", b"02", b"03", b"04", b"05", b"06", b"09", b"10"], width=2)),
+        FieldSpec("SG_UF", "C", 2, lambda b: _const(b, b"22", 2)),
+        FieldSpec("ID_MN_RESI", "C", 6, lambda b: _choice(b, MUNICIPIOS, 6)),
+        FieldSpec("ID_RG_RESI", "C", 4, lambda b: _choice(b, [b"%04d" % i for i in range(1, 12)], 4)),
+        FieldSpec("ID_PAIS", "C", 3, lambda b: _const(b, b"1", 3)),
+        FieldSpec("NM_BAIRRO", "C", 60, lambda b: _choice(b, BAIRROS, 60)),
+        FieldSpec("CS_ZONA", "C", 1, code([b"1", b"2", b"3", b"9", b""])),
+        FieldSpec("DT_INTERNA", "D", 8, lambda b: _dates(b, b.dt_sin_pri + b.rng.integers(1, 10, b.size),
+                                                           blank_rate=0.9)),
+        FieldSpec("HOSPITALIZ", "C", 1, code([b"1", b"2", b"9", b""], [0.08, 0.7, 0.1, 0.12])),
+        FieldSpec("RESUL_SORO", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("RESUL_NS1", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("RESUL_VI_N", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("RESUL_PCR_", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("SOROTIPO", "C", 1, code([b"1", b"2", b"3", b"4", b""], [0.02, 0.02, 0.01, 0.01, 0.94])),
+        FieldSpec("HISTOPA_N", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("IMUNOH_N", "C", 1, code([b"1", b"2", b"3", b"4", b""])),
+        FieldSpec("TPAUTOCTO", "C", 1, code([b"1", b"2", b"3", b""])),
+        FieldSpec("CLASSI_FIN", "C", 2, code([b"5", b"10", b"11", b"12", b"13", b"8", b""], width=2)),
+        FieldSpec("CRITERIO", "C", 1, code([b"1", b"2", b"3", b""])),
+        FieldSpec("DOENCA_TRA", "C", 1, code([b"1", b"2", b"9", b""])),
+        FieldSpec("CLINC_CHIK", "C", 1, code([b"1", b"2", b""])),
+        FieldSpec("EVOLUCAO", "C", 1, code([b"1", b"2", b"3", b"4", b"9", b""],
+                                           [0.8, 0.002, 0.003, 0.001, 0.05, 0.144])),
+        FieldSpec("DT_OBITO", "D", 8, lambda b: _dates(b, b.dt_notific + b.rng.integers(0, 20, b.size),
+                                                         blank_rate=0.998)),
+        FieldSpec("DT_ENCERRA", "D", 8, lambda b: _dates(b, b.dt_notific + b.rng.integers(0, 60, b.size),
+                                                           blank_rate=0.2)),
+        FieldSpec("NDUPLIC_N", "N", 1, lambda b: _choice(b, [b"", b"1", b"2"], 1, [0.97, 0.02, 0.01], right=True)),
+        FieldSpec("COUFINF", "C", 2, lambda b: _choice(b, [b"22", b""], 2)),
+        FieldSpec("COMUNINF", "C", 6, lambda b: _choice(b, MUNICIPIOS[:20] + [b""], 6)),
+    ]
+    fields += [FieldSpec(name, "C", 1, code(flag, flag_p)) for name in FLAG_FIELDS]
+    fields += [FieldSpec(name, "D", 8, lambda b: _dates(b, b.dt_notific + b.rng.integers(0, 30, b.size),
+                                                         blank_rate=0.7))
+               for name in EXTRA_DATE_FIELDS]
+
+    # Reservas (vazias ou com contadores numéricos) completam a largura do arquivo real
+    for i in range(len(fields), n_fields):
+        if i % 3 == 0:
+            fields.append(FieldSpec(f"NU_RES_{i:03d}", "N", 5,
+                                    lambda b: _choice(b, [b"", b"0", b"1", b"12", b"150"], 5, right=True)))
+        else:
+            fields.append(FieldSpec(f"CAMPO_{i:03d}", "C", 10, lambda b: _choice(b, [b""], 10)))
+    return fields[:n_fields]
+
+
+def _write_header(f, fields: List[FieldSpec], rows: int):
+    today = datetime.date.today()
+    header_length = 32 + 32 * len(fields) + 1
+    record_length = 1 + sum(field.length for field in fields)
+    f.write(struct.pack('<BBBBIHH20x', 0x03, today.year - 1900, today.month, today.day,
+                        rows, header_length, record_length))
+    for field in fields:
+        f.write(struct.pack('<11sc4xBB14x', field.name.encode('ascii'), field.type.encode('ascii'),
+                            field.length, field.decimals))
+    f.write(b'\r')
+
+
+def write_synthetic_dbf(path: str, rows: int, prefix: str = "DENGON", duplicate_rate: float = 0.02,
+                        n_fields: int = 150, deleted_rate: float = 0.0, seed: int = 0, year: int = 2024,
+                        block_rows: int = 100_000) -> str:
+    """Grava um DBF sintético SINAN em path e retorna o caminho."""
+    if prefix not in AGRAVOS:
+        raise ValueError(f"Prefixo sem agravo conhecido: {prefix}")
+
+    rng = np.random.default_rng(seed)
+    calendar = _Calendar(year)
+    fields = build_fields(n_fields)
+    record_dtype = np.dtype([("_deleted", "S1")] + [(field.name, f"S{field.length}") for field in fields])
+
+    with open(path, 'wb') as f:
+        _write_header(f, fields, rows)
+        for first_row in range(0, rows, block_rows):
+            size = min(block_rows, rows - first_row)
+            block = _Block(rng, size, first_row, AGRAVOS[prefix], duplicate_rate, year, calendar)
+            records = np.empty(size, dtype=record_dtype)
+            records["_deleted"] = np.where(rng.random(size) < deleted_rate, b"*", b" ")
+            for field in fields:
+                records[field.name] = field.generate(block)
+            records.tofile(f)
+        f.write(b'\x1a')
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um DBF sintético no formato SINAN (DENGON/CHIKON)")
+    parser.add_argument('output', help='Arquivo DBF de saída')
+    parser.add_argument('--rows', type=int, default=100_000, help='Número de registros (ex: 10000 a 5000000)')
+    parser.add_argument('--prefix', choices=sorted(AGRAVOS), default='DENGON', help='Formato do arquivo')
+    parser.add_argument('--duplicate-rate', type=float, default=0.02,
+                        help='Fração de registros que repetem a chave de um registro anterior')
+    parser.add_argument('--deleted-rate', type=float, default=0.0, help='Fração de registros marcados como apagados')
+    parser.add_argument('--fields', type=int, default=150, help='Número de campos do arquivo')
+    parser.add_argument('--seed', type=int, default=0, help='Semente (mesma semente, mesmo arquivo)')
+    parser.add_argument('--year', type=int, default=2024, help='Ano das notificações (NU_ANO)')
+    args = parser.parse_args()
+
+    write_synthetic_dbf(args.output, args.rows, prefix=args.prefix, duplicate_rate=args.duplicate_rate,
+                        n_fields=args.fields, deleted_rate=args.deleted_rate, seed=args.seed, year=args.year)
+    print(f" -> {args.output}: {args.rows} registros, {args.fields} campos")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,23 @@ class Config:
     # Define o diretório de entrada. Se não existir no .env, usa './data/input' como fallback
     DATA_INPUT_DIR = os.getenv('DATA_INPUT_DIR', './data/input')
 
+    # Manifesto local dos arquivos já carregados (SQLite)
+    MANIFEST_PATH = os.getenv('MANIFEST_PATH', './data/manifest.sqlite')
+
+    # Cache em Parquet dos DBFs já transformados (limite de tamanho total e idade das entradas)
+    CACHE_DIR = os.getenv('CACHE_DIR', './data/cache')
+    CACHE_MAX_MB = int(os.getenv('CACHE_MAX_MB', '2048'))
+    CACHE_MAX_AGE_DAYS = float(os.getenv('CACHE_MAX_AGE_DAYS', '30'))
+
+    # Checksums dos arquivos de entrada por (tamanho, mtime), compartilhados por cache, manifesto e checkpoint
+    CHECKSUM_INDEX_PATH = os.getenv('CHECKSUM_INDEX_PATH', './data/checksums.json')
+
+    # Destinos locais (--sink parquet/duckdb/sqlite): dataset Parquet particionado e bancos embarcados
+    LOCAL_SINK_DIR = os.getenv('LOCAL_SINK_DIR', './data/warehouse')
+
+    # Relatórios JSON de cada execução (instrumentação por etapa) e dumps do --profile
+    REPORT_DIR = os.getenv('REPORT_DIR', './data/reports')
+
 # Cria o diretório se não existir
 if not os.path.exists(Config.DATA_INPUT_DIR):
     os.makedirs(Config.DATA_INPUT_DIR)
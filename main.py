@@ -1,59 +1,213 @@
 import argparse
 import sys
 import os
+from contextlib import contextmanager
+from dataclasses import dataclass
 from config import Config
 from src.core.scanner import FileScanner
-from src.core.factory import SourceFactory
-from src.utils.loaders import FileLoader # Usado apenas para leitura genérica manual
-from src.utils.database import Database # Novo import
+from src.core.factory import SinkFactory, SourceFactory
+from src.utils.metrics import RunMetrics
+# pandas, SQLAlchemy e afins são importados dentro dos comandos que os usam (inicialização rápida do CLI)
+# Tabela destino e chave de cada fonte: get_target_table / get_key_columns da própria fonte
+# Prefixos processados pelos modos auto e watch
+AUTO_PREFIXES = ['DENGON', 'CHIKON']
+# Coluna de particionamento das tabelas destino (opção --partition-by-year)
+PARTITION_COLUMN = "NU_ANO"
 
-def process_source(file_path, prefix_or_label):
+DEFAULT_BATCH_ROWS = 100_000
+
+@dataclass
+class RunOptions:
+    """Opções de execução aplicadas a cada arquivo processado (também nos processos filhos)."""
+    stream: bool = False
+    batch_rows: int = DEFAULT_BATCH_ROWS
+    memory_report: bool = False
+    use_cache: bool = True
+    partition_by_year: bool = False
+    resume: bool = False
+    trace_memory: bool = False
+    aggregates: bool = False
+    sink: str = 'postgres'
+
+    @property
+    def partition_column(self):
+        return PARTITION_COLUMN if self.partition_by_year else None
+
+    @property
+    def aggregate_specs(self):
+        if not self.aggregates:
+            return None
+        from src.utils.aggregates import CASE_AGGREGATES
+        return CASE_AGGREGATES
+
+    def build_sink(self):
+        """
+        Destino dos dados (--sink). Particionamento por ano, --resume e tabelas resumo são do PostgreSQL;
+        os destinos locais (Parquet, DuckDB, SQLite) gravam em Config.LOCAL_SINK_DIR.
+        """
+        sink_class = SinkFactory.get_sink_class(self.sink)
+        if self.sink == 'postgres':
+            return sink_class(partition_column=self.partition_column, aggregates=self.aggregate_specs,
+                              resume=self.resume, batch_rows=self.batch_rows)
+        ignored = [flag for flag, value in (('--partition-by-year', self.partition_by_year),
+                                            ('--resume', self.resume), ('--aggregates', self.aggregates)) if value]
+        if ignored:
+            print(f"Aviso: {', '.join(ignored)} só vale(m) para o destino postgres; ignorado(s) em {self.sink}.")
+        if self.sink == 'parquet':
+            return sink_class(os.path.join(Config.LOCAL_SINK_DIR, 'parquet'))
+        return sink_class(os.path.join(Config.LOCAL_SINK_DIR, f'dvs.{self.sink}'), engine=self.sink)
+
+    def build_cache(self):
+        if not self.use_cache:
+            return None
+        from src.utils.cache import ParquetCache
+        return ParquetCache(Config.CACHE_DIR, Config.CACHE_MAX_MB * 1024 * 1024,
+                            Config.CACHE_MAX_AGE_DAYS * 86400)
+
+def process_source_stream(source, file_path, options, sink):
+    """
+    Modo streaming: lê, transforma e envia ao staging lote a lote (memória O(lote)).
+    Retorna o número de registros carregados, ou None se a fonte não tiver tabela destino.
+    """
+    table_name = source.get_target_table()
+    if table_name is None:
+        print(f"Aviso: {source.get_name()} não possui tabela destino; modo streaming ignorado.")
+        return None
+
+    counts = sink.upsert_batches(source.read_batches(file_path, options.batch_rows), table_name,
+                                 source.get_key_columns(), file_path=file_path)
+    print("Status: Sucesso (Validado pela Classe Específica, modo streaming)")
+    return _loaded_rows(counts)
+
+@contextmanager
+def _open_sink(options, sink=None):
+    """Usa o destino recebido ou cria um a partir das opções; só fecha o que criou."""
+    if sink is not None:
+        yield sink
+        return
+    sink = options.build_sink()
+    try:
+        yield sink
+    finally:
+        sink.close()
+
+def _loaded_rows(counts):
+    """Registros gravados pelo destino (fora os ignorados, ex: ano nulo em tabela particionada)."""
+    if not counts:
+        return 0
+    return sum(counts.get(key, 0) for key in ("inserted", "updated", "unchanged"))
+
+def process_source(file_path, prefix_or_label, options=None, sink=None):
     """
     Processa usando a lógica de negócio específica via Factory.
+    sink: destino já aberto (reaproveitado entre arquivos); sem ele, um destino é criado e fechado aqui.
+    Retorna o número de registros carregados no banco, ou None se a fonte não é carregada (leitura genérica
+    ou fonte sem tabela destino). Erros de leitura ou de carga da fonte específica são propagados.
     """
+    options = options or RunOptions()
+    if prefix_or_label not in SourceFactory.prefixes():
+        # Sem fonte específica para o prefixo: modo manual genérico (só leitura)
+        read_generic(file_path)
+        return None
+
+    source = SourceFactory.get_source_by_prefix(prefix_or_label, cache=options.build_cache())
+    print(f"\n--- Processando {source.get_name()} ---")
+
+    if options.stream:
+        with _open_sink(options, sink) as active_sink:
+            return process_source_stream(source, file_path, options, active_sink)
+
+    df = source.read(file_path)
+
+    print("Status: Sucesso (Validado pela Classe Específica)")
+    print(f"Dimensões: {df.shape[0]} registros, {df.shape[1]} colunas")
+    if options.memory_report:
+        from src.utils.memory import memory_report
+        print("Memória por coluna (tipos largos x compactos):")
+        print(memory_report(df))
+    table_name = source.get_target_table()
+    counts = None
+    if not df.empty:
+        print("Preview:")
+        print(df.head(3))
+
+        # Carregar dados no banco de dados se a fonte tiver tabela destino
+        if table_name:
+            with _open_sink(options, sink) as active_sink:
+                counts = active_sink.upsert(df, table_name, source.get_key_columns(), file_path=file_path)
+    return _loaded_rows(counts) if table_name else None
+
+def read_generic(file_path):
+    """Leitura genérica (CSV ou DBF sem fonte específica): só exibe as dimensões, sem carga."""
+    from src.utils.loaders import FileLoader
+
+    print(f"\n--- Leitura Genérica: {os.path.basename(file_path)} ---")
     try:
-        # Tenta obter uma fonte específica pelo prefixo
-        source = SourceFactory.get_source_by_prefix(prefix_or_label)
-        print(f"\n--- Processando {source.get_name()} ---")
-        
-        df = source.read(file_path)
-        
-        print("Status: Sucesso (Validado pela Classe Específica)")
+        if file_path.lower().endswith('.csv'):
+            df = FileLoader.load_csv(file_path)
+        else:
+            df = FileLoader.load_dbf(file_path)
+
+        print("Status: Sucesso (Leitura Genérica)")
         print(f"Dimensões: {df.shape[0]} registros, {df.shape[1]} colunas")
-        if not df.empty:
-            print("Preview:")
-            print(df.head(3))
+    except Exception as e:
+        print(f"ERRO Genérico: {e}")
 
-            # Carregar dados no banco de dados se for Dengue
-            if source.get_name() == "Notificações de Dengue (SINAN)":
-                Database.upsert_dataframe(df, "dengue_completo", pk_columns=["ID_AGRAVO", "NU_NOTIFIC", "NU_ANO"])
-            elif source.get_name() == "Notificações de Chikungunya (SINAN)":
-                Database.upsert_dataframe(df, "chik_completo", pk_columns=["ID_AGRAVO", "NU_NOTIFIC", "NU_ANO"])
 
-    except ValueError:
-        # Se não achou fonte específica na Factory, cai aqui (modo manual genérico)
-        print(f"\n--- Leitura Genérica: {os.path.basename(file_path)} ---")
+def inspect_file(file_path):
+    """read --inspect: só o cabeçalho do DBF (contagem, campos, codificação, data de atualização)."""
+    from src.utils.loaders import FileLoader
+
+    info = FileLoader.inspect_dbf(file_path)
+    print(f"\n--- Cabeçalho: {os.path.basename(file_path)} ---")
+    print(f"Registros: {info['record_count']} (legíveis: {info['readable_records']}) | "
+          f"registro de {info['record_length']} bytes | cabeçalho de {info['header_length']} bytes")
+    print(f"Versão: 0x{info['version']:02X} | Última atualização: {info['last_update'] or '-'} | "
+          f"Codificação provável: {info['encoding_guess']} | Arquivo: {info['size_bytes']} bytes")
+    print(f"Campos ({len(info['fields'])}):")
+    for name, field_type, length, decimals in info['fields']:
+        print(f"  {name:<11} {field_type} {length:>4}{f'.{decimals}' if decimals else ''}")
+
+def preview_file(file_path, prefix_or_label, rows, sample=False, seed=None):
+    """
+    read --head/--sample: decodifica só `rows` registros e aplica as transformações da fonte (sem carga no banco).
+    Sem fonte específica para o prefixo, mostra os registros brutos.
+    """
+    from src.utils.loaders import FileLoader
+
+    mode = f"amostra aleatória de {rows}" if sample else f"primeiros {rows}"
+    # Só a ausência de fonte para o prefixo cai na prévia genérica
+    if prefix_or_label in SourceFactory.prefixes():
+        source = SourceFactory.get_source_by_prefix(prefix_or_label)
+        print(f"\n--- Prévia {source.get_name()} ({mode} registros) ---")
         try:
-            if file_path.lower().endswith('.csv'):
-                df = FileLoader.load_csv(file_path)
-            else:
-                df = FileLoader.load_dbf(file_path)
-            
-            print("Status: Sucesso (Leitura Genérica)")
-            print(f"Dimensões: {df.shape[0]} registros, {df.shape[1]} colunas")
-        except Exception as e:
-            print(f"ERRO Genérico: {e}")
-            
-    except Exception as e:
-        print(f"ERRO no processamento: {e}")
+            df = source.preview(file_path, rows, sample=sample, seed=seed)
+        except ValueError as e:
+            # Validação da fonte (ex: extensão não suportada): não é caso de leitura genérica
+            print(f"ERRO na prévia: {e}")
+            return
+    else:
+        print(f"\n--- Prévia Genérica: {os.path.basename(file_path)} ({mode} registros) ---")
+        df = FileLoader.preview_dbf(file_path, rows, sample=sample, seed=seed)
 
+    print(f"Dimensões da prévia: {df.shape[0]} registros, {df.shape[1]} colunas")
+    print(df.to_string(max_rows=rows, max_cols=20))
 
-def run_auto_mode():
-    """Busca automática DENGON e CHIKON."""
+def run_auto_mode(options=None, force=False, backfill=False, workers=1):
+    """
+    Busca automática DENGON e CHIKON.
+    Arquivos já registrados no manifesto são pulados (exceto com force).
+    Com backfill, todos os arquivos de cada prefixo são processados em ordem cronológica.
+    Com workers > 1, cada prefixo roda em um processo próprio.
+    Retorna o número de arquivos que falharam (0 se tudo foi carregado).
+    """
+    from src.utils.manifest import IngestionManifest
+
+    options = options or RunOptions()
     scanner = FileScanner(Config.DATA_INPUT_DIR)
+    manifest = IngestionManifest(Config.MANIFEST_PATH)
     
-    # Mapeamento Prefixo -> Rótulo (apenas para log se não achar)
-    targets = ['DENGON', 'CHIKON']
+    targets = AUTO_PREFIXES
     
     print(f"Iniciando varredura em: {Config.DATA_INPUT_DIR}")
 
@@ -61,45 +215,352 @@ def run_auto_mode():
     if not os.listdir(Config.DATA_INPUT_DIR):
         print(f"\nAviso: O diretório de entrada '{Config.DATA_INPUT_DIR}' está vazio.")
         print("Por favor, coloque os arquivos .dbf ou .csv a serem processados aqui.")
-        return # Sai da função se o diretório estiver vazio
+        return 0 # Sai da função se o diretório estiver vazio
     
-    found_any = False
+    # Arquivos pendentes por prefixo (arquivos do mesmo prefixo seguem a ordem cronológica)
+    jobs = {}
+    found = 0
     for prefix in targets:
-        latest_file = scanner.get_latest_file(prefix)
-        
-        if latest_file:
-            # Passa o prefixo para a Factory decidir qual classe usar
-            process_source(latest_file, prefix)
-            found_any = True
+        if backfill:
+            files = scanner.list_files(prefix)
         else:
+            latest_file = scanner.get_latest_file(prefix)
+            files = [latest_file] if latest_file else []
+        
+        if not files:
             print(f"\nAviso: Nenhum arquivo encontrado para prefixo '{prefix}'")
+            continue
+
+        found += len(files)
+        pending = []
+        for file_path in files:
+            if not force and manifest.is_ingested(file_path, options.sink):
+                print(f"\n--- {os.path.basename(file_path)} já carregado (manifesto). Use --force para reprocessar. ---")
+                continue
+            pending.append(file_path)
+        if pending:
+            # Prefixo sem pendências não vira job (nem processo vazio com --workers)
+            jobs[prefix] = pending
 
-    if not found_any:
-        print("\nNenhum arquivo válido encontrado.")
+    if not jobs:
+        if found:
+            print("\nNada a processar (todos os arquivos encontrados já foram carregados).")
+        else:
+            print("\nNenhum arquivo válido encontrado.")
+        return 0
+
+    if workers > 1 and len(jobs) > 1 and not SinkFactory.get_sink_class(options.sink).SUPPORTS_PARALLEL:
+        print(f"Aviso: o destino {options.sink} é um único arquivo de banco; --workers ignorado, "
+              f"fontes processadas em sequência.")
+        workers = 1
+    if workers > 1 and len(jobs) > 1:
+        return run_parallel(jobs, manifest, workers, options)
+    failed = 0
+    for prefix, files in jobs.items():
+        failed += len(files) - len(process_files(prefix, files, options, manifest=manifest))
+    return failed
+
+def run_watch_mode(options=None, interval=10.0, settle_seconds=5.0, backfill=False, metrics_file=None):
+    """
+    Modo contínuo: mantém um índice do diretório de entrada e envia cada arquivo DENGON/CHIKON novo
+    ao pipeline assim que ele fica completo (tamanho/mtime estáveis). O destino (e, no PostgreSQL, o pool
+    de conexões) é mantido entre arquivos. SIGTERM/SIGINT encerram após o arquivo em processamento.
+    """
+    import signal
+    import threading
+    from src.core.watcher import DirectoryWatcher
+    from src.utils.manifest import IngestionManifest
+
+    options = options or RunOptions()
+    manifest = IngestionManifest(Config.MANIFEST_PATH)
+    watcher = DirectoryWatcher(Config.DATA_INPUT_DIR, AUTO_PREFIXES, settle_seconds=settle_seconds)
+    if not backfill:
+        # Sem --backfill, dos arquivos já presentes só o mais recente de cada prefixo entra na fila
+        watcher.skip_existing(keep_latest=True)
+
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"\nSinal {signal.Signals(signum).name} recebido: encerrando após o arquivo atual...")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    # Destino aberto antes do primeiro arquivo e reaproveitado entre arquivos
+    sink = options.build_sink()
+    try:
+        sink.warm_up()
+    except Exception as e:
+        print(f"Aviso: destino {sink.get_name()} indisponível no início do watch ({e}); "
+              f"nova tentativa a cada arquivo.")
+
+    print(f"Monitorando {Config.DATA_INPUT_DIR} (a cada {interval:g}s, estabilidade {settle_seconds:g}s). "
+          f"Ctrl+C ou SIGTERM para encerrar.")
+    try:
+        while not stop.is_set():
+            for file_path in watcher.poll():
+                if stop.is_set():
+                    break
+                if manifest.is_ingested(file_path, options.sink):
+                    continue
+                print(f"\n>>> Novo arquivo: {os.path.basename(file_path)}")
+                if not process_files(watcher.prefix_of(file_path), [file_path], options, manifest=manifest,
+                                     sink=sink):
+                    delay = watcher.retry(file_path)
+                    print(f"Aviso: {os.path.basename(file_path)} não foi carregado; nova tentativa em {delay:g}s.")
+
+                # Um relatório por arquivo (em vez de um único ao encerrar o processo)
+                metrics = RunMetrics.active()
+                if metrics is not None and metrics.records:
+                    finish_run(metrics, metrics_file)
+                    RunMetrics.start(metrics.command, trace_memory=metrics.trace_memory,
+                                     profile_stage=metrics.profile_stage)
+            stop.wait(interval)
+    finally:
+        sink.close()
+        print("Watch encerrado.")
+
+def process_files(prefix, files, options, manifest=None, sink=None):
+    """
+    Processa, em ordem, os arquivos de um prefixo, todos pelo mesmo destino (recebido ou criado aqui).
+    Retorna [(arquivo, registros)] dos arquivos carregados; com manifest, registra cada um logo após a carga.
+    Um arquivo com erro é informado e fica fora do retorno (e do manifesto); os seguintes continuam.
+    """
+    loaded = []
+    with _open_sink(options, sink) as active_sink:
+        for file_path in files:
+            # Passa o prefixo para a Factory decidir qual classe usar
+            try:
+                with RunMetrics.file_scope(file_path):
+                    row_count = process_source(file_path, prefix, options, sink=active_sink)
+            except Exception as e:
+                print(f"ERRO no processamento de '{os.path.basename(file_path)}': {e}")
+                continue
+            if row_count is not None:
+                loaded.append((file_path, row_count))
+                if manifest is not None:
+                    manifest.record(file_path, prefix, row_count, sink=options.sink)
+    return loaded
+
+def _process_files_captured(prefix, files, options):
+    """Executado no processo filho: captura a saída para não intercalar os logs das fontes."""
+    import contextlib
+    import io
+    from src.utils.database import Database
+
+    # Cada processo abre as próprias conexões (o pool herdado do pai não pode ser compartilhado)
+    Database.reset_engine()
+    # Métricas do filho voltam ao processo principal junto com a saída (--profile vale só no principal)
+    metrics = RunMetrics.start(f"auto:{prefix}", trace_memory=options.trace_memory)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        try:
+            loaded = process_files(prefix, files, options)
+        except Exception as e:
+            print(f"ERRO no processamento de '{prefix}': {e}")
+            loaded = []
+    metrics.stop()
+    return loaded, output.getvalue(), metrics.report()["stages"]
+
+def run_parallel(jobs, manifest, workers, options):
+    """
+    Executa cada prefixo em um processo separado; a saída de cada fonte é exibida em bloco ao terminar.
+    O manifesto é atualizado apenas pelo processo principal. Retorna o número de arquivos que falharam.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    failed = 0
+    print(f"\nProcessando {len(jobs)} fontes em paralelo ({min(workers, len(jobs))} processos)...")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+        futures = {
+            executor.submit(_process_files_captured, prefix, files, options): prefix
+            for prefix, files in jobs.items()
+        }
+        for future in as_completed(futures):
+            prefix = futures[future]
+            try:
+                loaded, output, stages = future.result()
+            except Exception as e:
+                print(f"\n=== [{prefix}] ERRO no processo: {e} ===")
+                failed += len(jobs[prefix])
+                continue
+
+            print(f"\n=== [{prefix}] ===")
+            print(output, end="")
+            if RunMetrics.active() is not None:
+                RunMetrics.active().merge(stages)
+            failed += len(jobs[prefix]) - len(loaded)
+            for file_path, row_count in loaded:
+                manifest.record(file_path, prefix, row_count, sink=options.sink)
+    return failed
+
+def _add_report_arguments(subparser):
+    subparser.add_argument('--metrics-file', default=None,
+                           help='Grava também as métricas da execução neste arquivo (formato texto do Prometheus)')
+    subparser.add_argument('--profile', nargs='?', const='parse', default=None, metavar='ETAPA',
+                           help='Grava um cProfile da etapa (padrão: parse) junto ao relatório')
+    subparser.add_argument('--trace-memory', action='store_true',
+                           help='Mede o pico de memória alocada por etapa com tracemalloc (mais lento)')
+
+def finish_run(metrics, metrics_file=None):
+    """Encerra a instrumentação e grava o relatório JSON (e, se pedido, Prometheus e cProfile)."""
+    metrics.stop()
+    if not metrics.records:
+        return
+    metrics.print_summary()
+    print(f"Relatório da execução: {metrics.write_report(Config.REPORT_DIR)}")
+    if metrics_file:
+        metrics.write_prometheus(metrics_file)
+        print(f"Métricas Prometheus: {metrics_file}")
+    profile_path = metrics.write_profile(Config.REPORT_DIR)
+    if profile_path:
+        print(f"cProfile da etapa '{metrics.profile_stage}': {profile_path}")
+
+def _positive_int(value):
+    """Tipo do argparse para contagens (--head/--sample): inteiro >= 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"inteiro inválido: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"deve ser >= 1: {number}")
+    return number
+
+def _add_load_arguments(subparser):
+    """Opções de leitura e carga comuns aos comandos auto e watch."""
+    subparser.add_argument('--stream', action='store_true', help='Processa em lotes com memória limitada')
+    subparser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                           help=f'Registros por lote no modo --stream (padrão: {DEFAULT_BATCH_ROWS})')
+    subparser.add_argument('--dbf-workers', type=int, default=None,
+                           help='Processos para decodificar cada DBF em paralelo (padrão: DBF_WORKERS ou 1)')
+    subparser.add_argument('--upload-workers', type=int, default=None,
+                           help='Conexões simultâneas na carga do staging (padrão: DB_UPLOAD_WORKERS ou 1)')
+    subparser.add_argument('--memory-report', action='store_true',
+                           help='Exibe a memória por coluna antes e depois da compactação de tipos')
+    subparser.add_argument('--no-cache', action='store_true', help='Ignora o cache Parquet e relê o DBF')
+    subparser.add_argument('--partition-by-year', action='store_true',
+                           help='Cria as tabelas destino particionadas por NU_ANO e faz o merge por partição')
+    subparser.add_argument('--resume', action='store_true',
+                           help='Retoma a carga interrompida do arquivo, enviando ao staging só os lotes que faltam')
+    subparser.add_argument('--aggregates', action='store_true',
+                           help='Mantém as tabelas resumo (<tabela>_agg_semana) com os deltas de cada merge')
+    subparser.add_argument('--sink', choices=SinkFactory.names(), default='postgres',
+                           help='Destino dos dados: postgres (padrão) ou local em LOCAL_SINK_DIR '
+                                '(parquet particionado, duckdb, sqlite)')
+
+def _load_options(args):
+    if args.dbf_workers is not None:
+        # Via ambiente para valer também nos processos filhos do --workers
+        os.environ['DBF_WORKERS'] = str(args.dbf_workers)
+    if args.upload_workers is not None:
+        os.environ['DB_UPLOAD_WORKERS'] = str(args.upload_workers)
+    return RunOptions(stream=args.stream, batch_rows=args.batch_rows, memory_report=args.memory_report,
+                      use_cache=not args.no_cache, partition_by_year=args.partition_by_year,
+                      resume=args.resume, trace_memory=args.trace_memory, aggregates=args.aggregates,
+                      sink=args.sink)
 
 def main():
     parser = argparse.ArgumentParser(description="ETL DVS - CLI")
     subparsers = parser.add_subparsers(dest='command', help='Comandos')
     
     # Comando AUTO
-    subparsers.add_parser('auto', help='Processa automaticamente Dengue/Chikungunya')
+    parser_auto = subparsers.add_parser('auto', help='Processa automaticamente Dengue/Chikungunya')
+    parser_auto.add_argument('--force', action='store_true', help='Reprocessa arquivos já registrados no manifesto')
+    parser_auto.add_argument('--backfill', action='store_true',
+                             help='Processa todos os arquivos de cada prefixo (ordem cronológica), não só o mais recente')
+    parser_auto.add_argument('--workers', type=int, default=1,
+                             help='Número de fontes processadas em paralelo (um processo por fonte)')
+    _add_load_arguments(parser_auto)
+    _add_report_arguments(parser_auto)
+
+    # Comando WATCH
+    parser_watch = subparsers.add_parser('watch', help='Monitora o diretório de entrada e carrega arquivos novos')
+    parser_watch.add_argument('--interval', type=float, default=10.0,
+                              help='Segundos entre as varreduras do diretório (padrão: 10)')
+    parser_watch.add_argument('--settle', type=float, default=5.0,
+                              help='Segundos com tamanho/mtime estáveis para considerar o arquivo completo (padrão: 5)')
+    parser_watch.add_argument('--backfill', action='store_true',
+                              help='Carrega também todos os arquivos já presentes, não só o mais recente de cada prefixo')
+    _add_load_arguments(parser_watch)
+    _add_report_arguments(parser_watch)
+
+    # Comando AGGREGATES
+    parser_aggregates = subparsers.add_parser('aggregates',
+                                              help='Recalcula do zero as tabelas resumo das tabelas destino')
+    _add_report_arguments(parser_aggregates)
 
     # Comando READ
     parser_read = subparsers.add_parser('read', help='Lê arquivo manual')
     parser_read.add_argument('filename', help='Nome do arquivo')
+    parser_read.add_argument('--memory-report', action='store_true',
+                             help='Exibe a memória por coluna antes e depois da compactação de tipos')
+    parser_read.add_argument('--no-cache', action='store_true', help='Ignora o cache Parquet e relê o DBF')
+    preview_group = parser_read.add_mutually_exclusive_group()
+    preview_group.add_argument('--inspect', action='store_true',
+                               help='Mostra só o cabeçalho (registros, campos, codificação), sem ler os dados')
+    preview_group.add_argument('--head', type=_positive_int, metavar='N',
+                               help='Prévia transformada dos N primeiros registros (sem carga no banco)')
+    preview_group.add_argument('--sample', type=_positive_int, metavar='N',
+                               help='Prévia transformada de N registros aleatórios (sem carga no banco)')
+    parser_read.add_argument('--seed', type=int, default=None, help='Semente do --sample')
+    parser_read.add_argument('--sink', choices=SinkFactory.names(), default='postgres',
+                             help='Destino dos dados (padrão: postgres)')
+    _add_report_arguments(parser_read)
 
     args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        return
 
+    metrics = RunMetrics.start(args.command, trace_memory=args.trace_memory, profile_stage=args.profile)
+    try:
+        exit_code = run_command(args)
+    finally:
+        # O modo watch troca a execução ativa a cada arquivo; encerra a que estiver aberta
+        finish_run(RunMetrics.active() or metrics, args.metrics_file)
+    if exit_code:
+        sys.exit(exit_code)
+
+def run_command(args):
+    """Executa o comando e retorna o código de saída do processo (1 se algum arquivo falhou)."""
     if args.command == 'auto':
-        run_auto_mode()
+        failed = run_auto_mode(_load_options(args), force=args.force, backfill=args.backfill, workers=args.workers)
+        if failed:
+            print(f"\n{failed} arquivo(s) com erro; não registrados no manifesto.")
+            return 1
+    elif args.command == 'watch':
+        run_watch_mode(_load_options(args), interval=args.interval, settle_seconds=args.settle,
+                       backfill=args.backfill, metrics_file=args.metrics_file)
+    elif args.command == 'aggregates':
+        from src.utils.aggregates import CASE_AGGREGATES
+        from src.utils.database import Database
+        for prefix in SourceFactory.prefixes():
+            table_name = SourceFactory.get_source_by_prefix(prefix).get_target_table()
+            if table_name is None:
+                continue
+            print(f"\n--- Tabelas resumo de '{table_name}' ---")
+            Database.rebuild_aggregates(table_name, CASE_AGGREGATES)
     elif args.command == 'read':
         target = args.filename if os.path.exists(args.filename) else os.path.join(Config.DATA_INPUT_DIR, args.filename)
         # No modo manual, não sabemos o prefixo, passamos 'UNKNOWN' para cair no genérico
         # Ou poderíamos tentar deduzir o prefixo pelo nome do arquivo aqui.
         prefix = os.path.basename(target)[:6] # Tenta pegar os 6 primeiros caracteres
-        process_source(target, prefix)
-    else:
-        parser.print_help()
+        with RunMetrics.file_scope(target):
+            if args.inspect:
+                inspect_file(target)
+            elif args.head is not None or args.sample is not None:
+                sample = args.sample is not None
+                preview_file(target, prefix, args.sample if sample else args.head, sample=sample, seed=args.seed)
+            else:
+                try:
+                    process_source(target, prefix, RunOptions(memory_report=args.memory_report,
+                                                              use_cache=not args.no_cache, sink=args.sink))
+                except Exception as e:
+                    print(f"ERRO no processamento: {e}")
+                    return 1
+    return 0
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
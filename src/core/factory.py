@@ -1,17 +1,68 @@
-from src.core.sources.dengue import DengueSource
-from src.core.sources.chikungunya import ChikungunyaSource
-from src.interfaces.source import IDataSource
+import importlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.interfaces.source import IDataSource
+    from src.utils.cache import ParquetCache
 
 class SourceFactory:
     """
     Fabrica a instância correta da fonte de dados baseada no prefixo ou identificador.
+    O registro guarda só o caminho (módulo, classe) de cada fonte: o módulo (e o pandas/numpy que ele
+    importa) só é carregado quando a fonte é de fato usada.
     """
-    
-    @staticmethod
-    def get_source_by_prefix(prefix: str) -> IDataSource:
-        if prefix == 'DENGON':
-            return DengueSource()
-        elif prefix == 'CHIKON':
-            return ChikungunyaSource()
-        else:
+
+    _registry: Dict[str, Tuple[str, str]] = {
+        'DENGON': ('src.core.sources.dengue', 'DengueSource'),
+        'CHIKON': ('src.core.sources.chikungunya', 'ChikungunyaSource'),
+    }
+
+    @classmethod
+    def register(cls, prefix: str, module: str, class_name: str):
+        """Registra (ou substitui) a fonte de um prefixo sem importar o módulo."""
+        cls._registry[prefix] = (module, class_name)
+
+    @classmethod
+    def prefixes(cls) -> List[str]:
+        return list(cls._registry)
+
+    @classmethod
+    def get_source_class(cls, prefix: str):
+        if prefix not in cls._registry:
             raise ValueError(f"Não há implementação de fonte para o prefixo: {prefix}")
+        module, class_name = cls._registry[prefix]
+        return getattr(importlib.import_module(module), class_name)
+
+    @classmethod
+    def get_source_by_prefix(cls, prefix: str, cache: Optional["ParquetCache"] = None) -> "IDataSource":
+        return cls.get_source_class(prefix)(cache=cache)
+
+
+class SinkFactory:
+    """
+    Fabrica o destino dos dados pelo nome usado em --sink. Mesmo esquema de registro preguiçoso
+    do SourceFactory: psycopg2, pyarrow e duckdb só são importados quando o destino é escolhido.
+    """
+
+    _registry: Dict[str, Tuple[str, str]] = {
+        'postgres': ('src.core.sinks.postgres', 'PostgresSink'),
+        'parquet': ('src.core.sinks.parquet', 'ParquetSink'),
+        'duckdb': ('src.core.sinks.embedded', 'EmbeddedSink'),
+        'sqlite': ('src.core.sinks.embedded', 'EmbeddedSink'),
+    }
+
+    @classmethod
+    def register(cls, name: str, module: str, class_name: str):
+        """Registra (ou substitui) um destino sem importar o módulo."""
+        cls._registry[name] = (module, class_name)
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls._registry)
+
+    @classmethod
+    def get_sink_class(cls, name: str):
+        if name not in cls._registry:
+            raise ValueError(f"Destino não suportado: {name}")
+        module, class_name = cls._registry[name]
+        return getattr(importlib.import_module(module), class_name)
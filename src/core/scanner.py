@@ -1,7 +1,7 @@
 import os
-import glob
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 from src.interfaces.scanner import IFileScanner
+from src.utils.compressed import DBF_EXTENSIONS
 
 class FileScanner(IFileScanner):
     """
@@ -11,12 +11,30 @@ class FileScanner(IFileScanner):
     def __init__(self, directory: str):
         self.directory = directory
 
-    def get_latest_file(self, prefix: str, extension: str = ".dbf") -> Optional[str]:
-        pattern = os.path.join(self.directory, f"{prefix}*{extension}")
-        files = glob.glob(pattern)
+    def _scan(self, prefix: str, extension: Union[str, Tuple[str, ...]]) -> List[Tuple[float, str]]:
+        """(mtime, caminho) dos arquivos do critério, em uma única passada de scandir."""
+        if isinstance(extension, str):
+            extension = (extension,)
+        # Extensão sem diferenciar maiúsculas (extrações do DATASUS vêm como .DBC/.DBF)
+        extension = tuple(ext.lower() for ext in extension)
+        matches = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith(prefix) and name.lower().endswith(extension) and entry.is_file():
+                    matches.append((entry.stat().st_mtime, entry.path))
+        return matches
+
+    def get_latest_file(self, prefix: str,
+                        extension: Union[str, Tuple[str, ...]] = DBF_EXTENSIONS) -> Optional[str]:
+        files = self._scan(prefix, extension)
         
         if not files:
             return None
         
         # Ordena pela data de modificação
-        return max(files, key=os.path.getmtime)
+        return max(files)[1]
+
+    def list_files(self, prefix: str, extension: Union[str, Tuple[str, ...]] = DBF_EXTENSIONS) -> List[str]:
+        # Ordem cronológica (mtime) para backfill histórico
+        return [path for _, path in sorted(self._scan(prefix, extension))]
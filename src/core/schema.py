@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.metrics import RunMetrics
+
+# Tipos de campo suportados pelo schema declarativo
+STRING = 'str'
+CATEGORY = 'category'  # texto de baixa cardinalidade (codificado em dicionário)
+DATE = 'date'
+INTEGER = 'Int64'
+# Inteiros anuláveis compactos, para campos cujo domínio SINAN cabe na largura
+INT8 = 'Int8'
+INT16 = 'Int16'
+INT32 = 'Int32'
+
+INTEGER_TYPES = (INT8, INT16, INT32, INTEGER)
+
+
+@dataclass(frozen=True)
+class DerivedColumns:
+    """
+    Colunas calculadas a partir de campos brutos.
+    compute recebe o DataFrame bruto e devolve {coluna: valores} para cada coluna de outputs.
+    name identifica a etapa na instrumentação (RunMetrics).
+    """
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    compute: Callable[[pd.DataFrame], Dict[str, object]]
+    name: str = "derived"
+
+
+@dataclass(frozen=True)
+class SourceSchema:
+    """
+    Schema declarativo de uma fonte: campos brutos mantidos (na ordem de saída) com seu tipo,
+    seguidos das colunas derivadas. Compilado em uma única passada vetorizada por transform().
+    """
+    fields: Dict[str, str]
+    derived: Tuple[DerivedColumns, ...] = ()
+    pk_columns: Tuple[str, ...] = ("ID_AGRAVO", "NU_NOTIFIC", "NU_ANO")
+
+    @property
+    def output_columns(self) -> List[str]:
+        return list(self.fields) + [c for d in self.derived for c in d.outputs]
+
+    @property
+    def raw_fields(self) -> List[str]:
+        """Campos a ler do arquivo: os mantidos mais os insumos das colunas derivadas."""
+        raw = list(self.fields)
+        for d in self.derived:
+            raw += [c for c in d.inputs if c not in raw]
+        return raw
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converte os tipos, calcula as derivadas e projeta as colunas de saída.
+        Cada coluna é convertida uma vez e o DataFrame final é montado de uma só vez,
+        sem cópias intermediárias do frame inteiro. Campos ausentes no arquivo são ignorados.
+        """
+        converted = {}
+        # Conversões agrupadas por tipo, para a instrumentação medir cada grupo como uma etapa
+        for stage, types in (("dates", (DATE,)), ("numerics", INTEGER_TYPES), ("categories", (CATEGORY,))):
+            with RunMetrics.stage(f"transform.{stage}", rows_in=len(df)):
+                for name, field_type in self.fields.items():
+                    if field_type in types and name in df.columns:
+                        converted[name] = self._convert(df[name], field_type)
+
+        data = {name: converted.get(name, df[name]) for name in self.fields if name in df.columns}
+
+        for d in self.derived:
+            if all(c in df.columns for c in d.inputs):
+                with RunMetrics.stage(f"transform.{d.name}", rows_in=len(df)):
+                    values = d.compute(df)
+                for name in d.outputs:
+                    data[name] = values[name]
+
+        return pd.DataFrame(data, index=df.index, copy=False)
+
+    @staticmethod
+    def _convert(values: pd.Series, field_type: str):
+        if field_type == DATE:
+            if pd.api.types.is_datetime64_any_dtype(values):
+                return values
+            return pd.to_datetime(values, errors='coerce')
+        if field_type in INTEGER_TYPES:
+            numeric = pd.to_numeric(values, errors='coerce')
+            if field_type != INTEGER:
+                info = np.iinfo(field_type.lower())
+                if not numeric.dropna().between(info.min, info.max).all():
+                    # Valor fora do domínio esperado: mantém 64 bits em vez de truncar
+                    field_type = INTEGER
+            return numeric.astype(field_type)
+        if field_type == CATEGORY:
+            return values.astype('category')
+        return values
@@ -0,0 +1,122 @@
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.interfaces.sink import IDataSink
+from src.utils.hashing import ROW_HASH_COLUMN
+
+
+class EmbeddedSink(IDataSink):
+    """
+    Banco embarcado em um arquivo local: DuckDB (colunar, opcional: pip install duckdb) ou SQLite (biblioteca padrão).
+    Mesmo fluxo do PostgreSQL em escala menor: staging, índice único na chave e
+    INSERT ... ON CONFLICT DO UPDATE só das linhas com ROW_HASH diferente.
+    Um único processo por arquivo de banco (DuckDB não aceita dois; no SQLite os merges se bloqueariam).
+    """
+
+    STAGING_PREFIX = "_etl_staging_"
+    SUPPORTS_PARALLEL = False
+
+    def __init__(self, path: str, engine: str = "duckdb"):
+        if engine not in ("duckdb", "sqlite"):
+            raise ValueError(f"Banco embarcado não suportado: {engine}")
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.engine = engine
+        if engine == "duckdb":
+            try:
+                import duckdb
+            except ImportError:
+                raise ImportError("O destino duckdb requer o pacote 'duckdb' (pip install duckdb).")
+            self.conn = duckdb.connect(path)
+        else:
+            import sqlite3
+            self.conn = sqlite3.connect(path)
+
+    def get_name(self) -> str:
+        return self.engine
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _scalar(self, sql: str):
+        return self.conn.execute(sql).fetchone()[0]
+
+    def _table_columns(self, table_name: str) -> Optional[List[str]]:
+        if self.engine == "duckdb":
+            exists = self._scalar(f"SELECT COUNT(*) FROM information_schema.tables WHERE table_name = '{table_name}'")
+        else:
+            exists = self._scalar(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = '{table_name}'")
+        if not exists:
+            return None
+        cursor = self.conn.execute(f'SELECT * FROM "{table_name}" LIMIT 0')
+        return [d[0] for d in cursor.description]
+
+    def _stage(self, df: pd.DataFrame, staging: str):
+        # Categorias viram texto: no DuckDB virariam ENUM e novos valores seriam rejeitados depois
+        df = df.assign(**{c: df[c].astype(object) for c, t in df.dtypes.items() if isinstance(t, pd.CategoricalDtype)})
+        if self.engine == "duckdb":
+            # O DataFrame é lido direto pelo DuckDB, sem cópia para uma tabela
+            self.conn.register(staging, df)
+        else:
+            df.to_sql(staging, self.conn, if_exists='replace', index=False)
+
+    def _drop_staging(self, staging: str):
+        if self.engine == "duckdb":
+            self.conn.unregister(staging)
+        else:
+            self.conn.execute(f'DROP TABLE "{staging}"')
+
+    def upsert(self, df, table_name: str, key_columns: List[str],
+               file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        if df.empty:
+            print(" -> DataFrame vazio. Nada a processar.")
+            return None
+
+        df = df.drop_duplicates(subset=key_columns, keep='last')
+        db_cols = self._table_columns(table_name)
+        if db_cols is not None:
+            df = df[[c for c in df.columns if c in db_cols]]
+        # Staging por tabela destino: cargas de fontes diferentes no mesmo arquivo não se atropelam
+        staging = f"{self.STAGING_PREFIX}{table_name}"
+        self._stage(df, staging)
+        keys_str = ", ".join(f'"{c}"' for c in key_columns)
+        cols_str = ", ".join(f'"{c}"' for c in df.columns)
+        if db_cols is None:
+            self.conn.execute(f'CREATE TABLE "{table_name}" AS SELECT * FROM {staging} LIMIT 0')
+            index_name = f"{table_name}_{'_'.join(c.lower() for c in key_columns)}_key"
+            self.conn.execute(f'CREATE UNIQUE INDEX "{index_name}" ON "{table_name}" ({keys_str})')
+
+        join_on = " AND ".join(f't."{c}" = s."{c}"' for c in key_columns)
+        # SQLite escreve IS DISTINCT FROM como IS NOT
+        distinct = "IS DISTINCT FROM" if self.engine == "duckdb" else "IS NOT"
+        has_hash = ROW_HASH_COLUMN in df.columns
+
+        total = len(df)
+        existing = self._scalar(f'SELECT COUNT(*) FROM {staging} s JOIN "{table_name}" t ON {join_on}')
+        if has_hash:
+            updated = self._scalar(f'SELECT COUNT(*) FROM {staging} s JOIN "{table_name}" t ON {join_on} '
+                                   f'WHERE t."{ROW_HASH_COLUMN}" {distinct} s."{ROW_HASH_COLUMN}"')
+        else:
+            updated = existing
+
+        update_cols = [c for c in df.columns if c not in key_columns]
+        set_clause = ", ".join(f'"{c}" = excluded."{c}"' for c in update_cols)
+        where_clause = (f'WHERE "{table_name}"."{ROW_HASH_COLUMN}" {distinct} excluded."{ROW_HASH_COLUMN}"'
+                        if has_hash else "")
+        conflict = f"DO UPDATE SET {set_clause} {where_clause}" if update_cols else "DO NOTHING"
+        # WHERE true: no SQLite, desfaz a ambiguidade entre o ON do SELECT e o ON CONFLICT
+        self.conn.execute(f'INSERT INTO "{table_name}" ({cols_str}) SELECT {cols_str} FROM {staging} WHERE true '
+                          f'ON CONFLICT ({keys_str}) {conflict}')
+        self._drop_staging(staging)
+        self.conn.commit()
+
+        counts = {"inserted": total - existing, "updated": updated, "unchanged": existing - updated}
+        print(f" -> {self.engine} {self.path}:{table_name}: {counts['inserted']} inseridos, "
+              f"{counts['updated']} atualizados, {counts['unchanged']} inalterados.")
+        return counts
@@ -0,0 +1,162 @@
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+from src.interfaces.sink import IDataSink
+from src.utils.hashing import ROW_HASH_COLUMN
+
+# Nome de diretório do valor nulo, no padrão Hive (lido assim por pyarrow, DuckDB e Spark)
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _key_index(df: pd.DataFrame, key_columns: List[str]) -> pd.Index:
+    if len(key_columns) == 1:
+        return pd.Index(df[key_columns[0]])
+    return pd.MultiIndex.from_frame(df[key_columns])
+
+
+class ParquetSink(IDataSink):
+    """
+    Dataset Parquet local particionado no padrão Hive: {diretório}/{tabela}/ID_AGRAVO=A90/NU_ANO=2024/part-0.parquet.
+    O UPSERT reescreve só as partições presentes nos dados, e só quando alguma linha entra ou muda
+    (comparação pelo ROW_HASH). Cada partição é gravada em arquivo temporário e trocada atomicamente.
+    Consulta, por exemplo: duckdb "SELECT ... FROM read_parquet('dir/tabela/**/*.parquet', hive_partitioning=true)".
+    """
+
+    PARTITION_COLUMNS = ("ID_AGRAVO", "NU_ANO")
+    STAGING_SUFFIX = "_staging"
+
+    def __init__(self, directory: str, partition_columns: Tuple[str, ...] = PARTITION_COLUMNS):
+        self.directory = directory
+        self.partition_columns = tuple(partition_columns)
+
+    def get_name(self) -> str:
+        return "parquet"
+
+    # ------------------------------------------------------------------
+    # Partições
+    # ------------------------------------------------------------------
+
+    def _partition_path(self, root: str, values) -> str:
+        parts = []
+        for column, value in zip(self.partition_columns, values):
+            text = NULL_PARTITION if pd.isna(value) else quote(str(value), safe='')
+            parts.append(f"{column}={text}")
+        return os.path.join(root, *parts)
+
+    def _groups(self, df: pd.DataFrame):
+        columns = [c for c in self.partition_columns if c in df.columns]
+        if len(columns) != len(self.partition_columns):
+            raise ValueError(f"Colunas de partição ausentes nos dados: {set(self.partition_columns) - set(columns)}")
+        for values, part in df.groupby(columns, dropna=False, observed=True, sort=False):
+            yield values if isinstance(values, tuple) else (values,), part
+
+    def _read_partition(self, path: str, like: pd.DataFrame, values) -> Optional[pd.DataFrame]:
+        file_path = os.path.join(path, "part-0.parquet")
+        if not os.path.exists(file_path):
+            return None
+        old = pd.read_parquet(file_path)
+        # As colunas de partição ficam só no caminho; voltam com o tipo dos dados novos
+        for column, value in zip(self.partition_columns, values):
+            old[column] = pd.Series([value] * len(old), index=old.index).astype(like[column].dtype)
+        return old.reindex(columns=like.columns)
+
+    def _write_partition(self, path: str, df: pd.DataFrame):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        file_path = os.path.join(path, "part-0.parquet")
+        tmp_path = f"{file_path}.{os.getpid()}.tmp"
+        df.drop(columns=list(self.partition_columns)).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, file_path)
+
+    def _merge_partition(self, path: str, new: pd.DataFrame, key_columns: List[str], values) -> Dict[str, int]:
+        new = new.drop_duplicates(subset=key_columns, keep='last')
+        old = self._read_partition(path, new, values)
+        if old is None:
+            self._write_partition(path, new)
+            return {"inserted": len(new), "updated": 0, "unchanged": 0}
+
+        old_index = _key_index(old, key_columns)
+        new_index = _key_index(new, key_columns)
+        existing = new_index.isin(old_index)
+        inserted = int((~existing).sum())
+        if ROW_HASH_COLUMN in new.columns:
+            old_hash = pd.Series(old[ROW_HASH_COLUMN].to_numpy(), index=old_index)
+            previous = old_hash.reindex(new_index[existing]).to_numpy()
+            updated = int((previous != new[ROW_HASH_COLUMN].to_numpy()[existing]).sum())
+        else:
+            updated = int(existing.sum())
+        unchanged = int(existing.sum()) - updated
+
+        if inserted or updated:
+            merged = pd.concat([old[~old_index.isin(new_index)], new], ignore_index=True)
+            for column, dtype in new.dtypes.items():
+                if isinstance(dtype, pd.CategoricalDtype):
+                    # Categorias diferentes entre o antigo e o novo viram object no concat
+                    merged[column] = merged[column].astype('category')
+            self._write_partition(path, merged)
+        return {"inserted": inserted, "updated": updated, "unchanged": unchanged}
+
+    # ------------------------------------------------------------------
+    # UPSERT
+    # ------------------------------------------------------------------
+
+    def upsert(self, df, table_name: str, key_columns: List[str],
+               file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        if df.empty:
+            print(" -> DataFrame vazio. Nada a processar.")
+            return None
+        root = os.path.join(self.directory, table_name)
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        partitions = 0
+        for values, part in self._groups(df):
+            partition_counts = self._merge_partition(self._partition_path(root, values), part, key_columns, values)
+            partitions += 1
+            for key in counts:
+                counts[key] += partition_counts[key]
+        print(f" -> Parquet {root}: {partitions} partições | {counts['inserted']} inseridos, "
+              f"{counts['updated']} atualizados, {counts['unchanged']} inalterados.")
+        return counts
+
+    def upsert_batches(self, batches: Iterable, table_name: str, key_columns: List[str],
+                       file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """
+        Os lotes são separados por partição em arquivos de staging e cada partição é mesclada uma única vez
+        no final (memória limitada ao lote e à maior partição, sem reescrever a partição a cada lote).
+        """
+        root = os.path.join(self.directory, table_name)
+        # Fora da pasta da tabela, para consultas em andamento não enxergarem os lotes
+        staging = os.path.join(self.directory, f".{table_name}{self.STAGING_SUFFIX}")
+        shutil.rmtree(staging, ignore_errors=True)
+
+        staged = {}
+        try:
+            for batch_number, batch in enumerate(batches):
+                for values, part in self._groups(batch):
+                    path = self._partition_path(staging, values)
+                    if not os.path.exists(path):
+                        os.makedirs(path)
+                    part.to_parquet(os.path.join(path, f"batch-{batch_number:06d}.parquet"), index=False)
+                    staged[path] = values
+
+            if not staged:
+                print(" -> Nenhum registro nos lotes. Nada a processar.")
+                return None
+
+            counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+            for path, values in staged.items():
+                # Ordem dos lotes preservada: a última ocorrência da chave vence
+                files = sorted(os.listdir(path))
+                part = pd.concat([pd.read_parquet(os.path.join(path, f)) for f in files], ignore_index=True)
+                target = self._partition_path(root, values)
+                partition_counts = self._merge_partition(target, part, key_columns, values)
+                for key in counts:
+                    counts[key] += partition_counts[key]
+            print(f" -> Parquet {root}: {len(staged)} partições | {counts['inserted']} inseridos, "
+                  f"{counts['updated']} atualizados, {counts['unchanged']} inalterados.")
+            return counts
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,45 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from src.interfaces.sink import IDataSink
+from src.utils.database import Database
+from src.utils.hashing import cached_file_checksum
+
+
+class PostgresSink(IDataSink):
+    """
+    Destino padrão: UPSERT via staging no PostgreSQL (Database.upsert_dataframe / upsert_batches).
+    Particionamento por ano, retomada por checkpoint e tabelas resumo valem só aqui.
+    As conexões ficam no pool do Database (compartilhado no processo); close() encerra o pool.
+    """
+
+    def __init__(self, partition_column: Optional[str] = None, aggregates: Optional[Sequence] = None,
+                 resume: bool = False, batch_rows: Optional[int] = None):
+        self.partition_column = partition_column
+        self.aggregates = aggregates
+        self.resume = resume
+        self.batch_rows = batch_rows
+
+    def get_name(self) -> str:
+        return "postgres"
+
+    def warm_up(self):
+        with Database.get_engine().connect():
+            pass
+
+    def close(self):
+        Database.close_engine()
+
+    def upsert(self, df, table_name: str, key_columns: List[str],
+               file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        return Database.upsert_dataframe(df, table_name, pk_columns=key_columns,
+                                         partition_column=self.partition_column,
+                                         file_key=cached_file_checksum(file_path) if file_path else None,
+                                         resume=self.resume, aggregates=self.aggregates)
+
+    def upsert_batches(self, batches: Iterable, table_name: str, key_columns: List[str],
+                       file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        return Database.upsert_batches(batches, table_name, pk_columns=key_columns,
+                                       partition_column=self.partition_column,
+                                       file_key=cached_file_checksum(file_path) if file_path else None,
+                                       resume=self.resume, batch_rows=self.batch_rows,
+                                       aggregates=self.aggregates)
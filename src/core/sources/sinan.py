@@ -0,0 +1,171 @@
+import hashlib
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.core.schema import DerivedColumns, SourceSchema
+from src.interfaces.source import IDataSource
+from src.utils.cache import ParquetCache
+from src.utils.compressed import is_dbf_path
+from src.utils.hashing import add_row_hash
+from src.utils.loaders import FileLoader
+from src.utils.metrics import RunMetrics
+from src.utils.notification_key import NOTIF_KEY_COLUMN, add_notification_key
+
+# Faixas etárias padrão de epidemiologia: limite inferior (em anos) de cada faixa a partir de 1 ano
+AGE_BAND_EDGES = np.array([1, 5, 10, 15, 20, 30, 40, 50, 60, 70, 80])
+AGE_BAND_LABELS = [
+    "[<1]", "[1, 4]", "[5, 9]", "[10, 14]", "[15, 19]", "[20, 29]",
+    "[30, 39]", "[40, 49]", "[50, 59]", "[60, 69]", "[70, 79]", "[80, >]",
+]
+
+
+def derive_age(df: pd.DataFrame) -> Dict[str, object]:
+    """
+    Decompõe NU_IDADE_N (ex: 4030 -> tipo 4 = anos, valor 30) e calcula a faixa etária.
+    Tipo 4 (Ano): IDADE_2 = valor; tipos 1, 2, 3 (Hora, Dia, Mês): IDADE_2 = 0 (menor de 1 ano);
+    demais: IDADE_2 = NaN. A faixa é obtida por busca na tabela de limites, sem laço por registro.
+    """
+    nu_idade_n = pd.to_numeric(df["NU_IDADE_N"], errors='coerce')
+    # float em qualquer caso: sem nulos o pandas devolveria int64 e o tipo mudaria de lote para lote
+    tipo = (nu_idade_n // 1000).to_numpy(dtype=float)
+    valor_idade = (nu_idade_n % 1000).to_numpy(dtype=float)
+    idade = np.where(tipo == 4, valor_idade, np.where(np.isin(tipo, [1, 2, 3]), 0.0, np.nan))
+
+    known = ~np.isnan(idade)
+    codigo = np.searchsorted(AGE_BAND_EDGES, np.where(known, idade, 0), side='right')
+    # Códigos -1 viram nulo no Categorical
+    faixa = pd.Categorical.from_codes(np.where(known, codigo, -1), categories=AGE_BAND_LABELS, ordered=True)
+
+    return {
+        # Int8 anulável fixo: o mesmo registro tem o mesmo ROW_HASH na leitura inteira e em lotes
+        "TIPO_IDADE": pd.arrays.IntegerArray(np.nan_to_num(tipo).astype('int8'), np.isnan(tipo)),
+        "IDADE_2": idade,
+        "FAIXA_ETARIA": faixa,
+        "COD_FAIXA_ETARIA": pd.arrays.IntegerArray(codigo.astype('int8'), ~known),
+    }
+
+
+AGE_COLUMNS = DerivedColumns(
+    inputs=("NU_IDADE_N",),
+    outputs=("IDADE_2", "TIPO_IDADE", "FAIXA_ETARIA", "COD_FAIXA_ETARIA"),
+    compute=derive_age,
+    name="age_band",
+)
+
+
+class SinanSource(IDataSource):
+    """
+    Base das fontes SINAN em DBF: cada fonte só declara NAME, SCHEMA e TABLE_NAME.
+    Leitura, transformação, deduplicação pela chave e hash de linha são comuns.
+    """
+    NAME: str = ""
+    SCHEMA: SourceSchema = SourceSchema(fields={})
+    # Tabela destino; None para fontes só de leitura
+    TABLE_NAME: Optional[str] = None
+    # Chave do merge: (ID_AGRAVO, NU_NOTIFIC, NU_ANO) empacotados em um inteiro de 64 bits
+    KEY_COLUMNS = (NOTIF_KEY_COLUMN,)
+
+    # Incrementar quando a lógica de transformação mudar (invalida o cache em Parquet)
+    TRANSFORM_VERSION = 4
+
+    def __init__(self, cache: Optional[ParquetCache] = None):
+        self.cache = cache
+
+    def cache_version(self) -> str:
+        """Versão da transformação: número manual + assinatura do schema declarado."""
+        signature = repr((sorted(self.SCHEMA.fields.items()), [d.outputs for d in self.SCHEMA.derived]))
+        return f"v{self.TRANSFORM_VERSION}-{hashlib.blake2b(signature.encode(), digest_size=4).hexdigest()}"
+
+    def get_name(self) -> str:
+        return self.NAME
+
+    def get_target_table(self) -> Optional[str]:
+        return self.TABLE_NAME
+
+    def get_key_columns(self) -> List[str]:
+        return list(self.KEY_COLUMNS)
+
+    def get_required_fields(self) -> List[str]:
+        return self.SCHEMA.raw_fields
+
+    def _validate_path(self, file_path: str):
+        if not is_dbf_path(file_path):
+            raise ValueError(f"Fonte {self.NAME} requer arquivo .dbf (ou .dbc/.zip/.gz)")
+
+    def _deduplicate(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Deduplicar registros para evitar erro no UPSERT
+        # Mantemos a última ocorrência (presumindo ser a mais atualizada no arquivo)
+        # A chave empacotada (uma coluna int64) substitui o trio da PK quando existe
+        pk_cols = [NOTIF_KEY_COLUMN] if NOTIF_KEY_COLUMN in df.columns else list(self.SCHEMA.pk_columns)
+        if all(col in df.columns for col in pk_cols):
+            original_len = len(df)
+            with RunMetrics.stage("dedup", rows_in=original_len) as st:
+                df.drop_duplicates(subset=pk_cols, keep='last', inplace=True)
+                st.rows_out = len(df)
+            if len(df) < original_len:
+                print(f" -> [Aviso] {original_len - len(df)} registros duplicados removidos (mantido o último).")
+        return df
+
+    def _add_key(self, df: pd.DataFrame) -> pd.DataFrame:
+        if not all(col in df.columns for col in self.SCHEMA.pk_columns):
+            return df
+        with RunMetrics.stage("key", rows_in=len(df)):
+            return add_notification_key(df)
+
+    def _prepare(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transformação, chave empacotada, deduplicação e hash de linha de um frame bruto (arquivo inteiro ou lote)."""
+        df = self._deduplicate(self._add_key(self.SCHEMA.transform(df)))
+        with RunMetrics.stage("hash", rows_in=len(df)):
+            # NOTIF_KEY só reempacota a PK: fora do hash, que continua igual ao das linhas já no destino
+            return add_row_hash(df, exclude=(NOTIF_KEY_COLUMN,))
+
+    def read(self, file_path: str) -> pd.DataFrame:
+        self._validate_path(file_path)
+
+        if self.cache is not None:
+            with RunMetrics.stage("cache.get") as st:
+                df = self.cache.get(self.NAME, file_path, self.cache_version())
+                st.rows_out = None if df is None else len(df)
+            if df is not None:
+                print(f" -> [{type(self).__name__}] Cache Parquet: {file_path} ({len(df)} registros)")
+                return df
+
+        print(f" -> [{type(self).__name__}] Carregando DBF: {file_path}")
+        # Lê apenas os campos necessários; os demais nem são decodificados
+        with RunMetrics.stage("parse") as st:
+            df = FileLoader.load_dbf(file_path, columns=self.get_required_fields())
+            st.rows_out = len(df)
+
+        df = self._prepare(df)
+
+        if self.cache is not None:
+            try:
+                with RunMetrics.stage("cache.put", rows_in=len(df)):
+                    self.cache.put(self.NAME, file_path, self.cache_version(), df)
+            except Exception as e:
+                # Falha no cache não impede a carga
+                print(f" -> [Aviso] Não foi possível gravar o cache: {e}")
+        return df
+
+    def preview(self, file_path: str, rows: int, sample: bool = False, seed: Optional[int] = None) -> pd.DataFrame:
+        self._validate_path(file_path)
+        with RunMetrics.stage("parse") as st:
+            df = FileLoader.preview_dbf(file_path, rows, sample=sample, columns=self.get_required_fields(), seed=seed)
+            st.rows_out = len(df)
+        return self._prepare(df)
+
+    def read_batches(self, file_path: str, batch_rows: int) -> Iterator[pd.DataFrame]:
+        self._validate_path(file_path)
+
+        print(f" -> [{type(self).__name__}] Carregando DBF em lotes: {file_path}")
+        batches = FileLoader.iter_dbf(file_path, batch_rows, columns=self.get_required_fields())
+        while True:
+            with RunMetrics.stage("parse") as st:
+                batch = next(batches, None)
+                st.rows_out = 0 if batch is None else len(batch)
+            if batch is None:
+                return
+            # Duplicatas entre lotes são resolvidas no merge (última ocorrência vence)
+            yield self._prepare(batch)
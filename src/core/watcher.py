@@ -0,0 +1,137 @@
+import os
+import struct
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from src.utils.compressed import DBF_EXTENSIONS
+
+
+@dataclass
+class _FileState:
+    size: int
+    mtime_ns: int
+    changed_at: float
+    # (size, mtime_ns) da versão já despachada, para não reenviar o mesmo arquivo
+    dispatched: Optional[Tuple[int, int]] = None
+    # Cargas falhas da versão atual e instante (monotonic) da próxima tentativa
+    failures: int = 0
+    retry_at: float = 0.0
+
+
+class DirectoryWatcher:
+    """
+    Índice em memória do diretório de entrada, atualizado por varredura (os.scandir) a cada poll.
+    Um arquivo só é entregue quando tamanho e mtime ficam estáveis por settle_seconds
+    (cópia ou download terminado) e, no caso de DBF, quando o tamanho bate com o cabeçalho.
+    Cada versão do arquivo (tamanho, mtime) é entregue uma única vez, salvo quando a carga falha
+    (retry): aí volta a ser entregue após um intervalo que dobra a cada falha (até max_retry_seconds).
+    """
+
+    def __init__(self, directory: str, prefixes: Sequence[str],
+                 extension: Union[str, Tuple[str, ...]] = DBF_EXTENSIONS, settle_seconds: float = 5.0,
+                 retry_seconds: float = 30.0, max_retry_seconds: float = 900.0):
+        self.directory = directory
+        self.prefixes = tuple(prefixes)
+        extensions = (extension,) if isinstance(extension, str) else extension
+        self.extension = tuple(ext.lower() for ext in extensions)
+        self.settle_seconds = settle_seconds
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.files: Dict[str, _FileState] = {}
+
+    def prefix_of(self, file_path: str) -> Optional[str]:
+        name = os.path.basename(file_path)
+        return next((p for p in self.prefixes if name.startswith(p)), None)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(self.extension) and self.prefix_of(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return found
+
+    def skip_existing(self, keep_latest: bool = True):
+        """
+        Marca como já despachados os arquivos presentes agora, exceto (com keep_latest) o mais recente
+        de cada prefixo — o mesmo critério do modo auto sem --backfill.
+        """
+        now = time.monotonic()
+        latest = {}
+        for path, (size, mtime_ns) in self._scan().items():
+            self.files[path] = _FileState(size, mtime_ns, now, dispatched=(size, mtime_ns))
+            prefix = self.prefix_of(path)
+            if prefix not in latest or mtime_ns > self.files[latest[prefix]].mtime_ns:
+                latest[prefix] = path
+        if keep_latest:
+            for path in latest.values():
+                self.files[path].dispatched = None
+
+    def poll(self) -> List[str]:
+        """Atualiza o índice e devolve os arquivos prontos ainda não entregues, do mais antigo ao mais novo."""
+        now = time.monotonic()
+        found = self._scan()
+
+        for path in list(self.files):
+            if path not in found:
+                del self.files[path]
+
+        ready = []
+        for path, (size, mtime_ns) in found.items():
+            state = self.files.get(path)
+            if state is None:
+                self.files[path] = _FileState(size, mtime_ns, now)
+                continue
+            if (state.size, state.mtime_ns) != (size, mtime_ns):
+                # Ainda sendo escrito (ou substituído): reinicia a contagem de estabilidade e as falhas
+                state.size, state.mtime_ns, state.changed_at = size, mtime_ns, now
+                state.failures, state.retry_at = 0, 0.0
+                continue
+            if state.dispatched == (size, mtime_ns) or now - state.changed_at < self.settle_seconds:
+                continue
+            if now < state.retry_at:
+                continue
+            if not self._is_complete(path, size):
+                continue
+            state.dispatched = (size, mtime_ns)
+            ready.append((mtime_ns, path))
+
+        return [path for _, path in sorted(ready)]
+
+    def retry(self, file_path: str) -> Optional[float]:
+        """
+        Devolve à fila a versão despachada cuja carga falhou (banco fora, erro de leitura).
+        Retorna o intervalo até a nova tentativa: retry_seconds, dobrando a cada falha seguida.
+        """
+        state = self.files.get(file_path)
+        if state is None:
+            return None
+        delay = min(self.retry_seconds * 2 ** state.failures, self.max_retry_seconds)
+        state.failures += 1
+        state.retry_at = time.monotonic() + delay
+        state.dispatched = None
+        return delay
+
+    @staticmethod
+    def _is_complete(file_path: str, size: int) -> bool:
+        """
+        DBF: cabeçalho + registros declarados (o marcador de fim 0x1A é opcional).
+        ZIP: diretório central presente. Demais (.dbc, .gz) dependem só da estabilidade.
+        """
+        lower = file_path.lower()
+        if lower.endswith('.zip'):
+            return zipfile.is_zipfile(file_path)
+        if not lower.endswith('.dbf'):
+            return True
+        try:
+            with open(file_path, 'rb') as f:
+                header = f.read(12)
+        except OSError:
+            return False
+        if len(header) < 12:
+            return False
+        records, header_length, record_length = struct.unpack('<IHH', header[4:12])
+        return size >= header_length + records * record_length
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 
 class IFileScanner(ABC):
     """
@@ -7,8 +7,15 @@ class IFileScanner(ABC):
     """
 
     @abstractmethod
-    def get_latest_file(self, prefix: str, extension: str) -> Optional[str]:
+    def get_latest_file(self, prefix: str, extension: Union[str, Tuple[str, ...]]) -> Optional[str]:
         """
-        Busca o arquivo mais recente com base no critério.
+        Busca o arquivo mais recente com base no critério (extension aceita uma ou várias extensões).
+        """
+        pass
+
+    @abstractmethod
+    def list_files(self, prefix: str, extension: Union[str, Tuple[str, ...]]) -> List[str]:
+        """
+        Lista todos os arquivos do critério, do mais antigo para o mais recente.
         """
         pass
@@ -0,0 +1,53 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class IDataSink(ABC):
+    """
+    Interface para os destinos dos dados processados (PostgreSQL, Parquet particionado, banco embarcado).
+    Todos fazem UPSERT pela chave: a última ocorrência de cada chave vence e linhas com o mesmo
+    ROW_HASH não são reescritas.
+    """
+
+    # False: o destino não admite um processo por fonte (auto --workers roda as fontes em sequência)
+    SUPPORTS_PARALLEL = True
+
+    @abstractmethod
+    def get_name(self) -> str:
+        """Retorna o nome do destino (usado em --sink)."""
+        pass
+
+    @abstractmethod
+    def upsert(self, df: "pd.DataFrame", table_name: str, key_columns: List[str],
+               file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """
+        Grava o DataFrame na tabela pela chave e retorna as contagens (inserted, updated, unchanged).
+        file_path é o arquivo de origem, para destinos que registram a carga (ex: checkpoint).
+        """
+        pass
+
+    def upsert_batches(self, batches: Iterable["pd.DataFrame"], table_name: str, key_columns: List[str],
+                       file_path: Optional[str] = None) -> Optional[Dict[str, int]]:
+        """
+        Modo streaming: grava lote a lote, na ordem do arquivo (a última ocorrência vence).
+        Por padrão cada lote é um UPSERT; as contagens de chaves repetidas entre lotes são somadas.
+        """
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for batch in batches:
+            batch_counts = self.upsert(batch, table_name, key_columns, file_path=file_path) or {}
+            for key in counts:
+                counts[key] += batch_counts.get(key, 0)
+        return counts
+
+    def warm_up(self):
+        """
+        Abre conexões antes do primeiro arquivo (modo watch), para falhar cedo e reaproveitá-las.
+        Levanta exceção se o destino estiver indisponível. Por padrão não faz nada.
+        """
+        pass
+
+    def close(self):
+        """Libera conexões ou arquivos abertos pelo destino."""
+        pass
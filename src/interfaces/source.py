@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional
 import pandas as pd
 
 class IDataSource(ABC):
@@ -11,9 +12,42 @@ class IDataSource(ABC):
         """Retorna o nome amigável da fonte."""
         pass
 
+    @abstractmethod
+    def get_target_table(self) -> Optional[str]:
+        """Tabela destino nos sinks (None: a fonte só é lida, não é carregada)."""
+        pass
+
+    @abstractmethod
+    def get_key_columns(self) -> List[str]:
+        """Colunas da chave do UPSERT no destino."""
+        pass
+
     @abstractmethod
     def read(self, file_path: str) -> pd.DataFrame:
         """
         Lê o arquivo, aplica validações específicas e retorna o DataFrame.
         """
         pass
+
+    def get_required_fields(self) -> Optional[List[str]]:
+        """
+        Campos brutos do arquivo necessários para a fonte (inclusive insumos de colunas derivadas).
+        None significa que todos os campos devem ser lidos.
+        """
+        return None
+
+    @abstractmethod
+    def read_batches(self, file_path: str, batch_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Lê o arquivo em lotes já transformados (modo streaming).
+        Duplicatas entre lotes não são removidas aqui; ficam a cargo do merge no banco.
+        """
+        pass
+
+    @abstractmethod
+    def preview(self, file_path: str, rows: int, sample: bool = False, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Prévia já transformada de poucos registros: os primeiros `rows` ou, com sample, posições aleatórias.
+        Não lê o arquivo inteiro.
+        """
+        pass
@@ -0,0 +1,142 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import text
+
+# Tipos do PostgreSQL aceitos como dimensão e o valor que representa "não informado" (NULL) na chave
+_NUMERIC_TYPES = {"smallint", "integer", "bigint", "numeric", "real", "double precision"}
+_TEXT_TYPES = {"text", "character varying", "character"}
+
+
+@dataclass(frozen=True)
+class AggregateSpec:
+    """
+    Tabela resumo mantida junto com o merge: contagem de registros por combinação das dimensões.
+    A tabela física se chama {tabela destino}_agg_{name}.
+    """
+    name: str
+    dimensions: Tuple[str, ...]
+    count_column: str = "CASOS"
+
+    def table_for(self, table_name: str) -> str:
+        return f"{table_name}_agg_{self.name}"
+
+
+# Casos por semana epidemiológica x município x faixa etária x sexo x classificação x evolução
+CASES_BY_WEEK = AggregateSpec(
+    "semana", ("SEM_PRI", "ID_MN_RESI", "FAIXA_ETARIA", "CS_SEXO", "CLASSI_FIN", "EVOLUCAO"),
+)
+CASE_AGGREGATES = (CASES_BY_WEEK,)
+
+
+@dataclass
+class AggregateTable:
+    """Tabela resumo já criada no banco, com o valor de preenchimento de cada dimensão nula."""
+    spec: AggregateSpec
+    table: str
+    fill: Dict[str, str] = field(default_factory=dict)
+
+    def key_exprs(self, alias: str = "") -> List[str]:
+        prefix = f"{alias}." if alias else ""
+        return [f'COALESCE({prefix}"{c}", {self.fill[c]}) AS "{c}"' for c in self.spec.dimensions]
+
+
+class IncrementalAggregates:
+    """
+    Manutenção incremental das tabelas resumo no mesmo comando do merge:
+    as linhas inseridas ou atualizadas somam +1 na combinação nova e as linhas atualizadas
+    subtraem 1 da combinação antiga (ex: notificação reclassificada em CLASSI_FIN).
+    Dimensões nulas entram na chave como -1 (números) ou '' (texto), para a chave primária valer.
+    """
+
+    @staticmethod
+    def missing_dimensions(spec: AggregateSpec, columns: Sequence[str]) -> List[str]:
+        return [c for c in spec.dimensions if c not in columns]
+
+    @staticmethod
+    def _fill_values(conn, table_name, dimensions):
+        rows = conn.execute(text(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = :table"
+        ), {"table": table_name}).all()
+        types = dict(rows)
+        fill = {}
+        for column in dimensions:
+            data_type = types.get(column)
+            if data_type in _NUMERIC_TYPES:
+                fill[column] = "-1"
+            elif data_type in _TEXT_TYPES:
+                fill[column] = "''"
+            else:
+                raise ValueError(f"Dimensão '{column}' de '{table_name}' com tipo não suportado: {data_type}")
+        return fill
+
+    @staticmethod
+    def ensure(conn, table_name: str, spec: AggregateSpec) -> AggregateTable:
+        """
+        Garante a tabela resumo de table_name. Se ela ainda não existir, é criada e preenchida
+        a partir do conteúdo atual do destino (a partir daí só recebe deltas).
+        """
+        aggregate = AggregateTable(spec, spec.table_for(table_name),
+                                   IncrementalAggregates._fill_values(conn, table_name, spec.dimensions))
+        exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": aggregate.table}).scalar()
+        if exists:
+            return aggregate
+
+        dims_str = ", ".join(f'"{c}"' for c in spec.dimensions)
+        conn.execute(text(f'CREATE TABLE {aggregate.table} AS SELECT {dims_str}, 0::BIGINT AS "{spec.count_column}" '
+                          f'FROM {table_name} WITH NO DATA'))
+        conn.execute(text(f"ALTER TABLE {aggregate.table} ADD PRIMARY KEY ({dims_str})"))
+        IncrementalAggregates.rebuild(conn, table_name, aggregate)
+        return aggregate
+
+    @staticmethod
+    def rebuild(conn, table_name: str, aggregate: AggregateTable):
+        """Recalcula a tabela resumo inteira a partir do destino (criação ou correção de divergências)."""
+        spec = aggregate.spec
+        positions = ", ".join(str(i + 1) for i in range(len(spec.dimensions)))
+        conn.execute(text(f"TRUNCATE {aggregate.table}"))
+        result = conn.execute(text(
+            f'INSERT INTO {aggregate.table} SELECT {", ".join(aggregate.key_exprs())}, COUNT(*) '
+            f'FROM {table_name} GROUP BY {positions}'
+        ))
+        print(f" -> Tabela resumo '{aggregate.table}' calculada: {result.rowcount} combinações.")
+
+    @staticmethod
+    def dimensions(aggregates: Sequence[AggregateTable]) -> List[str]:
+        """União das dimensões, na ordem em que aparecem."""
+        return list(dict.fromkeys(c for a in aggregates for c in a.spec.dimensions))
+
+    @staticmethod
+    def delta_ctes(aggregates: Sequence[AggregateTable], added: str, removed: str) -> str:
+        """
+        CTEs que aplicam os deltas: `added` tem as linhas novas (RETURNING do merge) e `removed`
+        as versões antigas das linhas atualizadas. Todas as CTEs enxergam o mesmo snapshot,
+        então `removed` lê o destino antes do merge.
+        """
+        ctes = []
+        for i, aggregate in enumerate(aggregates):
+            spec = aggregate.spec
+            dims_str = ", ".join(f'"{c}"' for c in spec.dimensions)
+            positions = ", ".join(str(j + 1) for j in range(len(spec.dimensions)))
+            count = f'"{spec.count_column}"'
+            ctes.append(f"""
+        agg_delta_{i} AS (
+            SELECT {", ".join(aggregate.key_exprs())}, SUM(delta) AS delta
+            FROM (SELECT {dims_str}, 1 AS delta FROM {added}
+                  UNION ALL SELECT {dims_str}, -1 AS delta FROM {removed}) d
+            GROUP BY {positions}
+            HAVING SUM(delta) <> 0
+        ), agg_apply_{i} AS (
+            INSERT INTO {aggregate.table} ({dims_str}, {count})
+            SELECT {dims_str}, delta FROM agg_delta_{i}
+            ON CONFLICT ({dims_str})
+            DO UPDATE SET {count} = {aggregate.table}.{count} + EXCLUDED.{count}
+        )""")
+        return ",".join(ctes)
+
+    @staticmethod
+    def prune(conn, aggregates: Sequence[AggregateTable]):
+        """Remove as combinações que ficaram zeradas (todas as notificações foram reclassificadas)."""
+        for aggregate in aggregates:
+            conn.execute(text(f'DELETE FROM {aggregate.table} WHERE "{aggregate.spec.count_column}" = 0'))
@@ -0,0 +1,86 @@
+import os
+import re
+import time
+import unicodedata
+from typing import Optional
+
+import pandas as pd
+
+from src.utils.hashing import cached_file_checksum
+
+
+class ParquetCache:
+    """
+    Cache local em Parquet dos DataFrames já lidos e transformados.
+    A entrada é identificada pela fonte, pelo checksum do arquivo de origem e pela versão da transformação;
+    na leitura o Parquet é mapeado em memória, sem reprocessar o DBF.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_age_seconds: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    # ------------------------------------------------------------------
+    # Chave
+    # ------------------------------------------------------------------
+
+    def _entry_path(self, source_name: str, file_path: str, version: str) -> str:
+        ascii_name = unicodedata.normalize('NFKD', source_name).encode('ascii', 'ignore').decode()
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', ascii_name).strip('_').lower()
+        return os.path.join(self.directory, f"{slug}_{cached_file_checksum(file_path)}_{version}.parquet")
+
+    # ------------------------------------------------------------------
+    # Leitura / escrita
+    # ------------------------------------------------------------------
+
+    def get(self, source_name: str, file_path: str, version: str) -> Optional[pd.DataFrame]:
+        import pyarrow.parquet as pq
+
+        entry = self._entry_path(source_name, file_path, version)
+        if not os.path.exists(entry):
+            return None
+
+        try:
+            df = pq.read_table(entry, memory_map=True).to_pandas()
+        except Exception as e:
+            print(f" -> [Cache] Entrada ilegível descartada ({e}).")
+            os.remove(entry)
+            return None
+
+        # Marca o uso para a política de despejo (mais antigos saem primeiro)
+        os.utime(entry, None)
+        return df
+
+    def put(self, source_name: str, file_path: str, version: str, df: pd.DataFrame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        entry = self._entry_path(source_name, file_path, version)
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+        os.replace(tmp_path, entry)
+        self.evict()
+
+    def evict(self):
+        """Remove entradas mais antigas que max_age e, depois, as menos usadas até caber em max_bytes."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.parquet'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            if now - stat.st_mtime > self.max_age_seconds:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,128 @@
+import uuid
+from typing import Optional
+
+from sqlalchemy import text
+
+
+class LoadCheckpoint:
+    """
+    Checkpoint da carga do staging por lote, em tabelas de controle no PostgreSQL.
+    Cada lote gravado registra sua faixa (início, linhas) na mesma transação que o grava,
+    então após uma falha o staging contém exatamente os lotes registrados e a retomada
+    (resume) envia apenas os que faltam antes do merge.
+    """
+
+    RUNS_TABLE = "etl_load_runs"
+    CHUNKS_TABLE = "etl_load_chunks"
+
+    def __init__(self, engine, table_name: str, file_key: str, layout: str,
+                 total_rows: Optional[int] = None, resume: bool = False):
+        """
+        file_key identifica o arquivo de origem (checksum); layout descreve o fatiamento
+        (ex: 'chunksize=5000'). Só uma execução com o mesmo arquivo e fatiamento pode ser retomada.
+        """
+        self.engine = engine
+        self.table_name = table_name
+        self.file_key = file_key
+        self.layout = layout
+        self.total_rows = total_rows
+        self.completed = {}  # início do lote -> registros
+        self.resumed = False
+
+        with engine.begin() as conn:
+            self._ensure_tables(conn)
+            run_id = self._find_resumable(conn) if resume else None
+            if run_id:
+                self.run_id = run_id
+                self.resumed = True
+                self.completed = dict(conn.execute(
+                    text(f"SELECT chunk_start, chunk_rows FROM {self.CHUNKS_TABLE} WHERE run_id = :run_id"),
+                    {"run_id": run_id},
+                ).all())
+            else:
+                self.run_id = self._start_run(conn)
+
+    def _ensure_tables(self, conn):
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self.RUNS_TABLE} (
+                run_id TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                file_key TEXT NOT NULL,
+                layout TEXT NOT NULL,
+                total_rows BIGINT,
+                status TEXT NOT NULL,
+                started_at TIMESTAMP NOT NULL DEFAULT now(),
+                finished_at TIMESTAMP
+            )
+        """))
+        conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self.CHUNKS_TABLE} (
+                run_id TEXT NOT NULL REFERENCES {self.RUNS_TABLE} (run_id) ON DELETE CASCADE,
+                chunk_start BIGINT NOT NULL,
+                chunk_rows INTEGER NOT NULL,
+                committed_at TIMESTAMP NOT NULL DEFAULT now(),
+                PRIMARY KEY (run_id, chunk_start)
+            )
+        """))
+
+    def _find_resumable(self, conn) -> Optional[str]:
+        # Só é retomável a execução mais recente do arquivo, com o mesmo fatiamento
+        return conn.execute(text(f"""
+            SELECT run_id FROM {self.RUNS_TABLE}
+            WHERE table_name = :table_name AND file_key = :file_key AND status = 'running'
+              AND layout = :layout AND total_rows IS NOT DISTINCT FROM :total_rows
+            ORDER BY started_at DESC LIMIT 1
+        """), self._params()).scalar()
+
+    def _start_run(self, conn) -> str:
+        # Uma nova carga esvazia o staging: execuções pendentes da mesma tabela deixam de ser retomáveis
+        conn.execute(text(f"UPDATE {self.RUNS_TABLE} SET status = 'abandoned', finished_at = now() "
+                          f"WHERE table_name = :table_name AND status = 'running'"),
+                     {"table_name": self.table_name})
+        run_id = uuid.uuid4().hex
+        conn.execute(text(f"""
+            INSERT INTO {self.RUNS_TABLE} (run_id, table_name, file_key, layout, total_rows, status)
+            VALUES (:run_id, :table_name, :file_key, :layout, :total_rows, 'running')
+        """), {**self._params(), "run_id": run_id})
+        return run_id
+
+    def restart(self):
+        """Descarta a execução retomada (ex: staging incompatível) e inicia uma nova."""
+        with self.engine.begin() as conn:
+            self.run_id = self._start_run(conn)
+        self.completed = {}
+        self.resumed = False
+
+    def _params(self) -> dict:
+        return {"table_name": self.table_name, "file_key": self.file_key,
+                "layout": self.layout, "total_rows": self.total_rows}
+
+    @property
+    def completed_rows(self) -> int:
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"SELECT COALESCE(SUM(chunk_rows), 0) FROM {self.CHUNKS_TABLE} "
+                                     f"WHERE run_id = :run_id"), {"run_id": self.run_id}).scalar()
+
+    def is_done(self, chunk_start: int) -> bool:
+        return chunk_start in self.completed
+
+    def done_rows(self, chunk_start: int) -> int:
+        """Registros do lote já gravado que começa em chunk_start (lotes de tamanho variável)."""
+        return self.completed.get(chunk_start, 0)
+
+    def record(self, conn, chunk_start: int, chunk_rows: int):
+        """Registra o lote na transação SQLAlchemy que o gravou."""
+        conn.execute(text(f"INSERT INTO {self.CHUNKS_TABLE} (run_id, chunk_start, chunk_rows) "
+                          f"VALUES (:run_id, :chunk_start, :chunk_rows)"),
+                     {"run_id": self.run_id, "chunk_start": chunk_start, "chunk_rows": chunk_rows})
+
+    def record_raw(self, cursor, chunk_start: int, chunk_rows: int):
+        """Registra o lote na transação psycopg2 (COPY) que o gravou."""
+        cursor.execute(f"INSERT INTO {self.CHUNKS_TABLE} (run_id, chunk_start, chunk_rows) "
+                       f"VALUES (%s, %s, %s)", (self.run_id, chunk_start, chunk_rows))
+
+    def finish(self, conn):
+        """Marca a execução como concluída (na transação do merge) e descarta os registros de lote."""
+        conn.execute(text(f"UPDATE {self.RUNS_TABLE} SET status = 'done', finished_at = now() "
+                          f"WHERE run_id = :run_id"), {"run_id": self.run_id})
+        conn.execute(text(f"DELETE FROM {self.CHUNKS_TABLE} WHERE run_id = :run_id"), {"run_id": self.run_id})
@@ -0,0 +1,48 @@
+import threading
+from typing import Optional
+
+
+class AdaptiveChunkSize:
+    """
+    Tamanho de lote da carga escolhido pela vazão medida, em vez de um valor fixo.
+    A meta é que cada envio leve cerca de target_seconds: lotes pequenos pagam a ida e volta
+    ao banco muitas vezes, lotes grandes só aumentam a memória em trânsito e o trabalho
+    refeito numa falha. A vazão é suavizada (média móvel exponencial) e o tamanho muda no
+    máximo `growth` vezes por medição, dentro de [minimum, maximum].
+    Seguro entre threads: quem fatia (produtor) lê next_size e quem envia registra a medição.
+    """
+
+    def __init__(self, initial: int = 5000, target_seconds: float = 0.25, minimum: int = 1000,
+                 maximum: int = 50_000, smoothing: float = 0.5, growth: float = 4.0):
+        self.target_seconds = target_seconds
+        self.minimum = minimum
+        self.maximum = maximum
+        self.smoothing = smoothing
+        self.growth = growth
+        self.size = self._clamp(initial)
+        self.rate: Optional[float] = None  # registros/s suavizado
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def _clamp(self, size: float) -> int:
+        return int(min(max(size, self.minimum), self.maximum))
+
+    def next_size(self) -> int:
+        with self._lock:
+            return self.size
+
+    def record(self, rows: int, seconds: float):
+        """Registra um envio de `rows` registros que levou `seconds` e recalcula o tamanho."""
+        if rows <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            rate = rows / seconds
+            self.rate = rate if self.rate is None else self.smoothing * rate + (1 - self.smoothing) * self.rate
+            self.samples += 1
+            wanted = self.rate * self.target_seconds
+            wanted = min(max(wanted, self.size / self.growth), self.size * self.growth)
+            self.size = self._clamp(wanted)
+
+    def summary(self) -> str:
+        rate = f"{self.rate:,.0f} registros/s" if self.rate else "sem medição"
+        return f"lote final {self.size} ({rate}, {self.samples} medições)"
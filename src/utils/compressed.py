@@ -0,0 +1,266 @@
+import gzip
+import io
+import os
+import struct
+import zipfile
+from typing import BinaryIO, Iterator, List, Tuple
+
+# Extensões aceitas como DBF: o arquivo puro, o .dbc do DATASUS e extrações compactadas
+DBF_EXTENSIONS = ('.dbf', '.dbc', '.zip', '.gz')
+
+
+def is_dbf_path(file_path: str) -> bool:
+    return file_path.lower().endswith(DBF_EXTENSIONS)
+
+
+def is_compressed(file_path: str) -> bool:
+    """True para entradas que não permitem seek nos registros (lidas como stream)."""
+    return not file_path.lower().endswith('.dbf')
+
+
+def open_dbf_stream(file_path: str) -> BinaryIO:
+    """
+    Abre a entrada como um stream binário do DBF descompactado, sem arquivo temporário:
+    .dbf direto, .gz via gzip, .zip pelo primeiro membro .dbf/.dbc e .dbc pelo descompressor PKWare.
+    """
+    lower = file_path.lower()
+    if lower.endswith('.dbf'):
+        return open(file_path, 'rb')
+    if lower.endswith('.dbc'):
+        return _buffered(DBCStream(open(file_path, 'rb')))
+    if lower.endswith('.gz'):
+        stream = gzip.open(file_path, 'rb')
+        if lower[:-3].endswith('.dbc'):
+            return _buffered(DBCStream(stream))
+        return stream
+    if lower.endswith('.zip'):
+        return _open_zip_member(file_path)
+    raise ValueError(f"Extensão não suportada para DBF: {os.path.basename(file_path)}")
+
+
+def _buffered(raw: io.RawIOBase) -> BinaryIO:
+    return io.BufferedReader(raw, buffer_size=1 << 20)
+
+
+def _open_zip_member(file_path: str) -> BinaryIO:
+    archive = zipfile.ZipFile(file_path)
+    members = [m for m in archive.infolist() if m.filename.lower().endswith(('.dbf', '.dbc'))]
+    if not members:
+        archive.close()
+        raise ValueError(f"Nenhum .dbf/.dbc dentro de {os.path.basename(file_path)}")
+    member = members[0]
+    stream = _ZipMemberStream(archive, archive.open(member))
+    if member.filename.lower().endswith('.dbc'):
+        return _buffered(DBCStream(stream))
+    return _buffered(stream)
+
+
+class _ZipMemberStream(io.RawIOBase):
+    """Membro do zip que fecha também o ZipFile ao ser fechado."""
+
+    def __init__(self, archive: zipfile.ZipFile, member: BinaryIO):
+        self._archive = archive
+        self._member = member
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._member.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._member.close()
+            self._archive.close()
+        super().close()
+
+
+class DBCStream(io.RawIOBase):
+    """
+    Stream do DBF contido em um .dbc (formato do DATASUS): o cabeçalho do DBF vem sem compressão,
+    seguido de 4 bytes de CRC e dos registros comprimidos com PKWare DCL implode.
+    Os registros são descomprimidos sob demanda (memória limitada à janela de 4 KB mais o bloco lido).
+    """
+
+    def __init__(self, source: BinaryIO):
+        self._source = source
+        head = source.read(10)
+        if len(head) < 10:
+            raise ValueError("Arquivo DBC inválido: cabeçalho incompleto.")
+        header_length = struct.unpack('<H', head[8:10])[0]
+        header = head + source.read(header_length - 10)
+        source.read(4)  # CRC
+        self._pending = bytearray(header)
+        self._chunks = explode(source)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = bytearray(chunk)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        del self._pending[:n]
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._source.close()
+        super().close()
+
+
+# ----------------------------------------------------------------------
+# PKWare DCL explode (formato do blast.c de Mark Adler)
+# ----------------------------------------------------------------------
+
+_MAXBITS = 13
+_WINDOW = 4096
+
+# Comprimentos dos códigos de Huffman, em forma compacta (4 bits de repetição, 4 bits de comprimento)
+_LITLEN = bytes([
+    11, 124, 8, 7, 28, 7, 188, 13, 76, 4, 10, 8, 12, 10, 12, 10, 8, 23, 8,
+    9, 7, 6, 7, 8, 7, 6, 55, 8, 23, 24, 12, 11, 7, 9, 11, 12, 6, 7, 22, 5,
+    7, 24, 6, 11, 9, 6, 7, 22, 7, 11, 38, 7, 9, 8, 25, 11, 8, 11, 9, 12,
+    8, 12, 5, 38, 5, 38, 5, 11, 7, 5, 6, 21, 6, 10, 53, 8, 7, 24, 10, 27,
+    44, 253, 253, 253, 252, 252, 252, 13, 12, 45, 12, 45, 12, 61, 12, 45,
+    44, 173,
+])
+_LENLEN = bytes([2, 35, 36, 53, 38, 23])
+_DISTLEN = bytes([2, 20, 53, 230, 247, 151, 248])
+_BASE = (3, 2, 4, 5, 6, 7, 8, 9, 10, 12, 16, 24, 40, 72, 136, 264)
+_EXTRA = (0, 0, 0, 0, 0, 0, 0, 0, 1, 2, 3, 4, 5, 6, 7, 8)
+
+
+def _decode_table(rep: bytes) -> List[Tuple[int, int]]:
+    """
+    Tabela de decodificação direta: indexada pelos próximos 13 bits do stream (LSB primeiro),
+    devolve (símbolo, bits do código). Evita percorrer o código bit a bit em Python.
+    """
+    lengths = []
+    for value in rep:
+        lengths += [value & 15] * ((value >> 4) + 1)
+
+    # Códigos canônicos na ordem do blast.c (por comprimento, depois por símbolo)
+    table = [(0, 0)] * (1 << _MAXBITS)
+    code = 0
+    for length in range(1, _MAXBITS + 1):
+        for symbol, symbol_length in enumerate(lengths):
+            if symbol_length != length:
+                continue
+            # No stream o código vem invertido (bits complementados) e do bit mais significativo ao menos
+            inverted = ~code & ((1 << length) - 1)
+            pattern = int(format(inverted, f'0{length}b')[::-1], 2)
+            for high in range(1 << (_MAXBITS - length)):
+                table[pattern | (high << length)] = (symbol, length)
+            code += 1
+        code <<= 1
+    return table
+
+
+_LIT_TABLE = None
+_LEN_TABLE = None
+_DIST_TABLE = None
+
+
+def _tables():
+    global _LIT_TABLE, _LEN_TABLE, _DIST_TABLE
+    if _LIT_TABLE is None:
+        _LIT_TABLE = _decode_table(_LITLEN)
+        _LEN_TABLE = _decode_table(_LENLEN)
+        _DIST_TABLE = _decode_table(_DISTLEN)
+    return _LIT_TABLE, _LEN_TABLE, _DIST_TABLE
+
+
+def explode(source: BinaryIO, read_size: int = 1 << 16, flush_size: int = 1 << 20) -> Iterator[bytes]:
+    """Descomprime um stream PKWare DCL implode, produzindo blocos de até ~flush_size bytes."""
+    lit_table, len_table, dist_table = _tables()
+
+    data = source.read(read_size)
+    pos = 0
+    bitbuf = 0
+    bitcnt = 0
+
+    def fill(need):
+        # Garante ao menos `need` bits no buffer (lendo mais do stream quando preciso)
+        nonlocal data, pos, bitbuf, bitcnt
+        while bitcnt < need:
+            if pos + 8 > len(data):
+                more = source.read(read_size)
+                data = data[pos:] + more
+                pos = 0
+                if not data:
+                    return bitcnt >= need
+            take = min(8, len(data) - pos)
+            bitbuf |= int.from_bytes(data[pos:pos + take], 'little') << bitcnt
+            pos += take
+            bitcnt += 8 * take
+        return True
+
+    if not fill(16):
+        raise ValueError("Stream DBC vazio ou truncado.")
+    lit = bitbuf & 0xFF
+    dict_bits = (bitbuf >> 8) & 0xFF
+    bitbuf >>= 16
+    bitcnt -= 16
+    if lit > 1 or not 4 <= dict_bits <= 6:
+        raise ValueError("Stream DBC inválido: cabeçalho PKWare desconhecido.")
+
+    out = bytearray()
+    while True:
+        # Pior caso de um símbolo: 1 + 13 + 8 (comprimento) + 13 + 6 (distância)
+        if bitcnt < 41:
+            fill(41)
+
+        if bitbuf & 1:
+            bitbuf >>= 1
+            symbol, nbits = len_table[bitbuf & 0x1FFF]
+            bitbuf >>= nbits
+            extra = _EXTRA[symbol]
+            length = _BASE[symbol] + (bitbuf & ((1 << extra) - 1))
+            bitbuf >>= extra
+            if length == 519:  # código de fim
+                break
+            shift = 2 if length == 2 else dict_bits
+            symbol, nbits2 = dist_table[bitbuf & 0x1FFF]
+            bitbuf >>= nbits2
+            dist = (symbol << shift) + (bitbuf & ((1 << shift) - 1)) + 1
+            bitbuf >>= shift
+            bitcnt -= 1 + nbits + extra + nbits2 + shift
+            if nbits == 0 or nbits2 == 0 or bitcnt < 0 or dist > len(out):
+                raise ValueError("Stream DBC corrompido ou truncado.")
+
+            start = len(out) - dist
+            if length <= dist:
+                out += out[start:start + length]
+            else:
+                # Cópia sobreposta: repete o padrão dos últimos `dist` bytes
+                pattern = out[start:]
+                out += (pattern * (length // dist + 1))[:length]
+        else:
+            if lit:
+                symbol, nbits = lit_table[(bitbuf >> 1) & 0x1FFF]
+                if nbits == 0:
+                    raise ValueError("Stream DBC corrompido.")
+                bitbuf >>= 1 + nbits
+                bitcnt -= 1 + nbits
+            else:
+                symbol = (bitbuf >> 1) & 0xFF
+                bitbuf >>= 9
+                bitcnt -= 9
+            if bitcnt < 0:
+                raise ValueError("Stream DBC truncado.")
+            out.append(symbol)
+
+        if len(out) >= flush_size + _WINDOW:
+            # Entrega o bloco e mantém só a janela necessária para as próximas cópias
+            yield bytes(out[:-_WINDOW])
+            del out[:-_WINDOW]
+
+    if out:
+        yield bytes(out)
@@ -1,12 +1,22 @@
 from sqlalchemy import create_engine, text, inspect
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+import time
+from contextlib import contextmanager
+import config  # carrega o .env (uma única vez, em config.py)
+from src.utils.aggregates import IncrementalAggregates
+from src.utils.hashing import ROW_HASH_COLUMN
+from src.utils.notification_key import NOTIF_KEY_COLUMN, notification_key_sql
+from src.utils.metrics import RunMetrics
 
 class Database:
     _engine = None
 
+    # Coluna auxiliar do staging em modo streaming (posição do registro no arquivo)
+    STAGING_ORDER_COLUMN = "_etl_seq"
+
+    # Tempos por fase do último UPSERT (segundos)
+    last_timings = {}
+
     @classmethod
     def get_engine(cls):
         if cls._engine is None:
@@ -20,120 +30,791 @@ class Database:
 
             # Formato da string de conexão para PostgreSQL
             DATABASE_URL = f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}/{db_name}"
-            cls._engine = create_engine(DATABASE_URL)
+            # Pool comporta as conexões de upload paralelo mais a do merge
+            # pre_ping: conexões ociosas por muito tempo (modo watch) são testadas antes do uso
+            cls._engine = create_engine(DATABASE_URL, pool_size=max(5, cls.upload_workers() + 1),
+                                        pool_pre_ping=True)
         return cls._engine
 
     @staticmethod
-    def load_dataframe(df, table_name, if_exists='append', index=False, chunksize=2000):
+    def upload_workers():
+        """Conexões simultâneas na carga do staging (variável DB_UPLOAD_WORKERS, padrão 1)."""
+        return max(int(os.getenv("DB_UPLOAD_WORKERS", "1")), 1)
+
+    @staticmethod
+    def pipeline_depth():
+        """
+        Lotes já codificados à espera do envio na carga em pipeline (variável DB_PIPELINE_DEPTH, padrão 2).
+        Limita a memória: além da fila, só o lote em codificação e o lote em envio.
+        """
+        return max(int(os.getenv("DB_PIPELINE_DEPTH", "2")), 1)
+
+    @classmethod
+    def close_engine(cls):
+        """Fecha as conexões do pool (fim do processo ou do modo watch)."""
+        if cls._engine is not None:
+            cls._engine.dispose()
+        cls._engine = None
+
+    @classmethod
+    def reset_engine(cls):
+        """
+        Descarta o engine herdado (ex: após fork) sem fechar as conexões do processo pai.
+        A próxima chamada de get_engine cria um pool novo.
+        """
+        if cls._engine is not None:
+            cls._engine.dispose(close=False)
+        cls._engine = None
+
+    # Marcador de nulo no CSV do COPY (distingue NULL de texto vazio)
+    COPY_NULL = "\\N"
+
+    # Tamanho de lote quando não é adaptativo: INSERTs do pandas (to_sql) e COPY em várias conexões.
+    # No COPY por uma conexão, o tamanho inicial do lote adaptativo.
+    TO_SQL_CHUNKSIZE = 2000
+    COPY_CHUNKSIZE = 5000
+
+    @staticmethod
+    def encode_chunk(chunk):
+        """
+        Codifica o lote no CSV do COPY. Int64 nulo, NaT e NaN viram NULL; texto vazio continua texto vazio.
+        Não usa conexão: na carga em pipeline roda numa thread enquanto o lote anterior é enviado.
+        """
+        import io
+
+        buffer = io.StringIO()
+        chunk.to_csv(buffer, index=False, header=False, na_rep=Database.COPY_NULL)
+        buffer.seek(0)
+        return buffer
+
+    @staticmethod
+    def copy_chunk(engine, chunk, table_name, checkpoint=None, chunk_start=0):
+        """
+        Envia um lote para uma tabela já existente via COPY ... FROM STDIN (psycopg2 copy_expert).
+        Com checkpoint, o lote é registrado na mesma transação do COPY.
+        """
+        Database.copy_buffer(engine, Database.encode_chunk(chunk), list(chunk.columns), len(chunk), table_name,
+                             checkpoint=checkpoint, chunk_start=chunk_start)
+
+    @staticmethod
+    def copy_buffer(engine, buffer, columns, rows, table_name, checkpoint=None, chunk_start=0):
+        """COPY de um lote já codificado por encode_chunk (`rows` registros nas colunas `columns`)."""
+        cols_str = ", ".join([f'"{c}"' for c in columns])
+        sql_copy = (f"COPY public.{table_name} ({cols_str}) FROM STDIN "
+                    f"WITH (FORMAT csv, NULL '{Database.COPY_NULL}')")
+
+        raw_conn = engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cursor:
+                cursor.copy_expert(sql_copy, buffer)
+                if checkpoint is not None:
+                    checkpoint.record_raw(cursor, chunk_start, rows)
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+
+    @staticmethod
+    def _sql_dtypes(df):
+        """
+        Tipos SQL das colunas compactas: inteiros estreitos (Int8/16/32) continuam BIGINT
+        e categorias continuam TEXT, como nas tabelas já existentes.
+        """
+        import pandas as pd
+        from sqlalchemy.types import BigInteger, Text
+
+        dtypes = {}
+        for col, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtypes[col] = Text()
+            elif pd.api.types.is_integer_dtype(dtype):
+                dtypes[col] = BigInteger()
+        return dtypes
+
+    @staticmethod
+    def _write_chunk(engine, chunk, table_name, if_exists, index, method, create_table,
+                     checkpoint=None, chunk_start=0):
+        dtypes = Database._sql_dtypes(chunk)
+        if method == 'to_sql':
+            if checkpoint is None:
+                chunk.to_sql(table_name, engine, if_exists=if_exists, index=index, schema='public', dtype=dtypes)
+                return
+            # Lote e checkpoint na mesma transação
+            with engine.begin() as conn:
+                chunk.to_sql(table_name, conn, if_exists=if_exists, index=index, schema='public', dtype=dtypes)
+                checkpoint.record(conn, chunk_start, len(chunk))
+            return
+
+        if index:
+            chunk = chunk.reset_index()
+        if create_table:
+            # Cria (ou recria) a tabela com o schema inferido pelo pandas, sem enviar linhas
+            chunk.head(0).to_sql(table_name, engine, if_exists=if_exists, index=False, schema='public',
+                                 dtype=dtypes)
+        Database.copy_chunk(engine, chunk, table_name, checkpoint=checkpoint, chunk_start=chunk_start)
+
+    @staticmethod
+    def _write_chunks_parallel(engine, df, table_name, chunksize, index, method, workers, pbar,
+                               checkpoint=None, base_start=0):
+        """
+        Grava fatias disjuntas do DataFrame em paralelo, cada uma por uma conexão do pool.
+        A tabela já deve existir. No primeiro erro as fatias pendentes são canceladas e o erro é propagado.
+        Com checkpoint, fatias já registradas (início base_start + posição) são puladas.
+        """
+        import threading
+        from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+        lock = threading.Lock()
+
+        def write(start):
+            chunk = df.iloc[start : start + chunksize]
+            Database._write_chunk(engine, chunk, table_name, 'append', index, method, create_table=False,
+                                  checkpoint=checkpoint, chunk_start=base_start + start)
+            with lock:
+                pbar.update(len(chunk))
+
+        starts = range(0, len(df), chunksize)
+        if checkpoint is not None:
+            done = {start for start in starts if checkpoint.is_done(base_start + start)}
+            pbar.update(sum(len(df.iloc[start : start + chunksize]) for start in done))
+            starts = [start for start in starts if start not in done]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(write, start) for start in starts]
+            done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                future.result()
+
+    @staticmethod
+    def _write_chunks_pipelined(engine, df, table_name, sizer, pbar, checkpoint=None):
+        """
+        Carga em pipeline por uma conexão: uma thread fatia e codifica o lote k+1 (CSV, nulos)
+        enquanto o lote k está no COPY. A fila limitada (DB_PIPELINE_DEPTH) segura a memória.
+        O tamanho de cada fatia vem de `sizer` (AdaptiveChunkSize), alimentado pelo tempo de cada COPY.
+        A tabela já deve existir. Com checkpoint, faixas já registradas são puladas pelo tamanho gravado,
+        então a retomada funciona mesmo com lotes de tamanhos diferentes.
+        """
+        import queue
+        import threading
+
+        pending = queue.Queue(maxsize=Database.pipeline_depth())
+        stop = threading.Event()
+        columns = list(df.columns)
+
+        def put(item):
+            # Não trava se o envio já falhou e parou de consumir a fila
+            while not stop.is_set():
+                try:
+                    pending.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce():
+            try:
+                start = 0
+                while start < len(df) and not stop.is_set():
+                    if checkpoint is not None and checkpoint.is_done(start):
+                        rows = checkpoint.done_rows(start)
+                        put((start, rows, None))
+                    else:
+                        chunk = df.iloc[start : start + sizer.next_size()]
+                        rows = len(chunk)
+                        put((start, rows, Database.encode_chunk(chunk)))
+                    start += rows
+                put(None)
+            except BaseException as e:
+                put(e)
+
+        producer = threading.Thread(target=produce, name=f"encode-{table_name}", daemon=True)
+        producer.start()
+        try:
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                start, rows, buffer = item
+                if buffer is not None:
+                    sent_at = time.perf_counter()
+                    Database.copy_buffer(engine, buffer, columns, rows, table_name,
+                                         checkpoint=checkpoint, chunk_start=start)
+                    sizer.record(rows, time.perf_counter() - sent_at)
+                pbar.update(rows)
+        finally:
+            stop.set()
+            producer.join()
+
+    @staticmethod
+    def load_dataframe(df, table_name, if_exists='append', index=False, chunksize=None, method='to_sql',
+                       workers=None, checkpoint=None, pipeline=True):
+        """
+        Carrega o DataFrame em lotes.
+        method='copy' usa COPY FROM STDIN (bulk); method='to_sql' mantém os INSERTs do pandas.
+        workers > 1 grava os lotes por várias conexões ao mesmo tempo (padrão: DB_UPLOAD_WORKERS).
+        Com COPY por uma conexão e pipeline=True, a codificação do próximo lote se sobrepõe ao envio do atual
+        e, sem chunksize, o tamanho do lote se ajusta à vazão medida (AdaptiveChunkSize).
+        Sem chunksize nos demais modos: TO_SQL_CHUNKSIZE (to_sql) ou COPY_CHUNKSIZE (várias conexões).
+        Com checkpoint (LoadCheckpoint), cada lote é registrado ao ser gravado e lotes já registrados são pulados.
+        """
         from tqdm import tqdm
         import math
         
+        if method not in ('copy', 'to_sql'):
+            raise ValueError(f"Método de carga inválido: {method}")
+
         engine = Database.get_engine()
+        workers = workers or Database.upload_workers()
         total_rows = len(df)
-        chunks = math.ceil(total_rows / chunksize)
-        
-        print(f" -> Carregando {total_rows} registros para a tabela '{table_name}' em {chunks} lotes...")
+        pipelined = pipeline and method == 'copy' and workers == 1
+        if chunksize is None and not pipelined:
+            chunksize = Database.TO_SQL_CHUNKSIZE if method == 'to_sql' else Database.COPY_CHUNKSIZE
+
+        if pipelined:
+            from src.utils.chunking import AdaptiveChunkSize
+            if chunksize:
+                # Tamanho fixo pedido pelo chamador: só a sobreposição codificação/envio
+                sizer = AdaptiveChunkSize(initial=chunksize, minimum=chunksize, maximum=chunksize)
+            else:
+                sizer = AdaptiveChunkSize(initial=Database.COPY_CHUNKSIZE)
+            print(f" -> Carregando {total_rows} registros para a tabela '{table_name}' em pipeline "
+                  f"(copy, lotes de {chunksize or 'tamanho adaptativo'})...")
+        else:
+            chunks = math.ceil(total_rows / chunksize)
+            print(f" -> Carregando {total_rows} registros para a tabela '{table_name}' em {chunks} lotes ({method}"
+                  f"{f', {workers} conexões' if workers > 1 else ''})...")
         
         try:
-            # Barra de progresso para o upload
+            # Barra de progresso para o upload (agrega o progresso de todas as conexões)
             with tqdm(total=total_rows, unit="rows", desc=f"Upload {table_name}") as pbar:
-                for i in range(0, total_rows, chunksize):
-                    chunk = df.iloc[i : i + chunksize]
-                    
-                    # Lógica para if_exists:
-                    # O primeiro chunk respeita o parâmetro original (ex: 'replace' ou 'append')
-                    # Os chunks subsequentes devem ser sempre 'append'
-                    current_if_exists = if_exists if i == 0 else 'append'
-                    
-                    chunk.to_sql(table_name, engine, if_exists=current_if_exists, index=index, schema='public')
-                    pbar.update(len(chunk))
+                if pipelined:
+                    # A tabela é criada/recriada antes; a thread de codificação só produz linhas
+                    Database._write_chunk(engine, df.head(0), table_name, if_exists, index, method, create_table=True)
+                    Database._write_chunks_pipelined(engine, df.reset_index() if index else df, table_name,
+                                                     sizer, pbar, checkpoint=checkpoint)
+                elif workers > 1 and chunks > 1:
+                    # A tabela é criada/recriada antes, para que as conexões só acrescentem linhas
+                    Database._write_chunk(engine, df.head(0), table_name, if_exists, index, method, create_table=True)
+                    Database._write_chunks_parallel(engine, df, table_name, chunksize, index, method, workers, pbar,
+                                                    checkpoint=checkpoint)
+                else:
+                    for i in range(0, total_rows, chunksize):
+                        chunk = df.iloc[i : i + chunksize]
+                        if checkpoint is not None and checkpoint.is_done(i):
+                            pbar.update(len(chunk))
+                            continue
+                        
+                        # Lógica para if_exists:
+                        # O primeiro chunk respeita o parâmetro original (ex: 'replace' ou 'append')
+                        # Os chunks subsequentes devem ser sempre 'append'
+                        current_if_exists = if_exists if i == 0 else 'append'
+                        
+                        Database._write_chunk(engine, chunk, table_name, current_if_exists, index, method,
+                                              create_table=(i == 0), checkpoint=checkpoint, chunk_start=i)
+                        pbar.update(len(chunk))
                     
+            if pipelined and not chunksize:
+                print(f" -> Lotes adaptativos: {sizer.summary()}.")
             print(f" -> Dados carregados com sucesso na tabela '{table_name}'.")
         except Exception as e:
             print(f" -> ERRO ao carregar dados para a tabela '{table_name}': {e}")
             raise # Re-raise a exceção para notificar o chamador
 
     @staticmethod
-    def upsert_dataframe(df, table_name, pk_columns=["NU_NOTIFIC", "NU_ANO"], chunksize=5000):
+    def _get_table_columns(engine, table_name):
+        """Retorna as colunas da tabela no banco, ou None se ela ainda não existir."""
+        inspector = inspect(engine)
+        if not inspector.has_table(table_name):
+            return None
+        return [c['name'] for c in inspector.get_columns(table_name)]
+
+    @staticmethod
+    def _sync_columns(df, db_cols):
+        # Filtra o DF para ter apenas colunas que existem no banco
+        dropped = set(df.columns) - set(db_cols)
+        if dropped:
+            print(f" -> Aviso: Ignorando colunas ausentes no banco: {dropped}")
+            df = df[[c for c in df.columns if c in db_cols]]
+        return df
+
+    @staticmethod
+    def _ensure_primary_key(conn, table_name, pk_columns):
+        # Consulta o catálogo em vez de tentar o ALTER e engolir o erro
+        existing = inspect(conn).get_pk_constraint(table_name).get('constrained_columns') or []
+        pk_str = ", ".join([f'"{c}"' for c in pk_columns])
+        if set(existing) == set(pk_columns):
+            return
+        if existing:
+            # Destino criado com outra PK (ex: o trio natural, antes da chave empacotada):
+            # o ON CONFLICT precisa de um índice único nas colunas do merge
+            index_name = f"{table_name}_{'_'.join(c.lower() for c in pk_columns)}_key"
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {table_name} ({pk_str})"))
+            return
+        conn.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY ({pk_str})"))
+        print(f" -> PK ({pk_str}) adicionada.")
+
+    @staticmethod
+    def _pg_type(dtype):
+        """Tipo (information_schema.data_type) com que o pandas cria a coluna, com os tipos de _sql_dtypes."""
+        import pandas as pd
+
+        if isinstance(dtype, pd.CategoricalDtype):
+            return 'text'
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'boolean'
+        if pd.api.types.is_integer_dtype(dtype):
+            return 'bigint'
+        if pd.api.types.is_float_dtype(dtype):
+            return 'real' if dtype == 'float32' else 'double precision'
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            return 'timestamp with time zone'
+        if pd.api.types.is_datetime64_dtype(dtype):
+            return 'timestamp without time zone'
+        return 'text'
+
+    @staticmethod
+    def _staging_matches(conn, staging_table, df):
+        """True se o staging existe, é UNLOGGED e tem exatamente as colunas do DataFrame, com os mesmos tipos."""
+        existing = conn.execute(text(
+            "SELECT column_name, data_type FROM information_schema.columns "
+            "WHERE table_schema = 'public' AND table_name = :name ORDER BY ordinal_position"
+        ), {"name": staging_table}).all()
+        persistence = conn.execute(text("SELECT relpersistence FROM pg_class WHERE oid = to_regclass(:name)"),
+                                   {"name": staging_table}).scalar()
+        expected = [(col, Database._pg_type(dtype)) for col, dtype in df.dtypes.items()]
+        return [tuple(row) for row in existing] == expected and persistence == 'u'
+
+    @staticmethod
+    def _prepare_staging(engine, staging_table, df, checkpoint=None):
+        """
+        Garante o staging UNLOGGED (sem WAL) com as colunas do DataFrame e o deixa vazio.
+        A tabela é reaproveitada entre cargas (TRUNCATE); só é recriada quando colunas ou tipos mudam.
+        Com um checkpoint retomado, o staging compatível é mantido com os lotes já gravados.
+        """
+        import pandas as pd
+
+        with engine.begin() as conn:
+            # Staging de versões anteriores (logado) é recriado
+            matches = Database._staging_matches(conn, staging_table, df)
+            if checkpoint is not None and checkpoint.resumed:
+                if matches:
+                    print(f" -> Retomando carga: {len(checkpoint.completed)} lote(s) já estão no staging.")
+                    return
+                print(" -> Staging incompatível com a carga interrompida; recomeçando do zero.")
+                checkpoint.restart()
+            if matches:
+                conn.execute(text(f"TRUNCATE {staging_table}"))
+                return
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+            ddl = pd.io.sql.get_schema(df.head(0), staging_table, con=conn, dtype=Database._sql_dtypes(df))
+            conn.execute(text(ddl.replace("CREATE TABLE", "CREATE UNLOGGED TABLE", 1)))
+
+    @staticmethod
+    @contextmanager
+    def _timed(timings, phase, rows=None):
+        # Acumula em timings e, se houver execução instrumentada, registra a etapa em RunMetrics
+        start = time.perf_counter()
+        try:
+            with RunMetrics.stage(f"db.{phase}", rows_in=rows):
+                yield
+        finally:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+    @staticmethod
+    def _print_timings(timings):
+        phases = " | ".join(f"{phase} {seconds:.2f}s" for phase, seconds in timings.items())
+        print(f" -> Tempos por fase: {phases} | total {sum(timings.values()):.2f}s")
+
+    @staticmethod
+    def _finish_upsert(engine, table_name, staging_table, columns, pk_columns, timings, order_column=None,
+                       partition_column=None, checkpoint=None, aggregates=None):
+        """
+        Analisa o staging, garante destino e PK, executa o merge e esvazia o staging.
+        O checkpoint (se houver) é encerrado na mesma transação do merge.
+        Com partition_column, a tabela destino nova é criada particionada (LIST) por essa coluna e o merge
+        é feito partição a partição, apenas nas partições presentes no staging. Linhas com a coluna nula
+        não têm partição (a coluna faz parte da PK): são contadas em counts["skipped"], com aviso.
+        aggregates (AggregateSpec) são as tabelas resumo atualizadas incrementalmente pelo merge.
+        """
+        with Database._timed(timings, 'analyze'), engine.begin() as conn:
+            # Estatísticas atualizadas para o planner escolher o join do ON CONFLICT
+            conn.execute(text(f"ANALYZE {staging_table}"))
+
+        with engine.begin() as conn:
+            with Database._timed(timings, 'destino/pk'):
+                partition_clause = f' PARTITION BY LIST ("{partition_column}")' if partition_column else ""
+                conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table_name} "
+                                  f"(LIKE {staging_table} INCLUDING DEFAULTS){partition_clause}"))
+                if order_column:
+                    conn.execute(text(f'ALTER TABLE {table_name} DROP COLUMN IF EXISTS "{order_column}"'))
+                # Em tabela particionada, a PK/índice único precisa conter a chave de particionamento
+                pk_columns = list(pk_columns) + [c for c in Database._partition_columns(conn, table_name)
+                                                 if c not in pk_columns]
+                Database._ensure_primary_key(conn, table_name, pk_columns)
+
+                partitions = None
+                if partition_column:
+                    if Database._is_partitioned(conn, table_name):
+                        partitions = Database._ensure_partitions(conn, table_name, partition_column, staging_table)
+                    else:
+                        print(f" -> Aviso: '{table_name}' já existe sem particionamento; merge na tabela inteira.")
+
+            aggregate_tables = []
+            if aggregates:
+                with Database._timed(timings, 'agregados'):
+                    aggregate_tables = Database._ensure_aggregates(conn, table_name, columns, aggregates)
+
+            with Database._timed(timings, 'merge'):
+                if partitions is None:
+                    counts = Database._merge_staging(conn, table_name, staging_table, columns, pk_columns,
+                                                     order_column=order_column, aggregates=aggregate_tables)
+                else:
+                    # Cada merge usa apenas o índice da partição do ano
+                    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+                    for value in partitions:
+                        partition_counts = Database._merge_staging(
+                            conn, f"{table_name}_{value}", staging_table, columns, pk_columns,
+                            order_column=order_column, source_filter=f'"{partition_column}" = {value}',
+                            aggregates=aggregate_tables)
+                        for key in counts:
+                            counts[key] += partition_counts[key]
+                    skipped = conn.execute(text(
+                        f'SELECT COUNT(*) FROM {staging_table} WHERE "{partition_column}" IS NULL')).scalar()
+                    if skipped:
+                        counts["skipped"] = skipped
+                        print(f" -> Aviso: {skipped} registros com {partition_column} nulo não foram carregados "
+                              f"(sem partição em '{table_name}').")
+                IncrementalAggregates.prune(conn, aggregate_tables)
+
+            with Database._timed(timings, 'truncate'):
+                conn.execute(text(f"TRUNCATE {staging_table}"))
+                if checkpoint is not None:
+                    checkpoint.finish(conn)
+        return counts
+
+    @staticmethod
+    def _ensure_aggregates(conn, table_name, columns, aggregates):
+        """Garante as tabelas resumo cujas dimensões existem nos dados; as demais são ignoradas com aviso."""
+        tables = []
+        for spec in aggregates:
+            missing = IncrementalAggregates.missing_dimensions(spec, columns)
+            if missing:
+                print(f" -> Aviso: resumo '{spec.name}' ignorado em '{table_name}'; colunas ausentes: {missing}")
+                continue
+            tables.append(IncrementalAggregates.ensure(conn, table_name, spec))
+        return tables
+
+    @staticmethod
+    def rebuild_aggregates(table_name, aggregates):
+        """Recalcula do zero as tabelas resumo de table_name (ex: após correções manuais no destino)."""
+        engine = Database.get_engine()
+        with engine.begin() as conn:
+            columns = Database._get_table_columns(conn, table_name)
+            if columns is None:
+                print(f" -> Tabela '{table_name}' não existe; nada a recalcular.")
+                return
+            for aggregate in Database._ensure_aggregates(conn, table_name, columns, aggregates):
+                IncrementalAggregates.rebuild(conn, table_name, aggregate)
+
+    @staticmethod
+    def _abort_staging(engine, staging_table, checkpoint):
+        if checkpoint is None:
+            Database._clear_staging(engine, staging_table)
+        else:
+            # Lotes registrados continuam no staging para a retomada (--resume)
+            print(f" -> Staging '{staging_table}' mantido; use --resume para enviar apenas os lotes que faltam.")
+
+    @staticmethod
+    def _clear_staging(engine, staging_table):
+        # Em caso de erro, apenas esvazia o staging (a tabela é reaproveitada na próxima carga)
+        try:
+            with engine.begin() as clean_conn:
+                clean_conn.execute(text(f"TRUNCATE {staging_table}"))
+        except Exception:
+            pass
+
+    @staticmethod
+    def _merge_staging(conn, table_name, staging_table, columns, pk_columns, order_column=None,
+                       source_filter=None, aggregates=None):
+        """
+        INSERT ... ON CONFLICT do staging para o destino.
+        Com order_column, o staging pode conter a mesma chave mais de uma vez:
+        DISTINCT ON mantém apenas a linha de maior ordem (a última ocorrência no arquivo).
+        Se houver a coluna de hash, registros com o mesmo conteúdo não são reescritos.
+        source_filter (condição SQL) restringe as linhas do staging, ex: as de uma partição.
+        aggregates (AggregateTable) recebem, no mesmo comando, os deltas das linhas inseridas e atualizadas.
+        Retorna as contagens de registros inseridos, atualizados e inalterados.
+        """
+        pk_str = ", ".join([f'"{c}"' for c in pk_columns])
+        cols_str = ", ".join([f'"{c}"' for c in columns])
+        update_cols = [c for c in columns if c not in pk_columns]
+        set_clause = ", ".join([f'"{c}" = EXCLUDED."{c}"' for c in update_cols])
+
+        where_source = f" WHERE {source_filter}" if source_filter else ""
+        if order_column:
+            select_sql = (f'SELECT DISTINCT ON ({pk_str}) {cols_str} FROM {staging_table}{where_source} '
+                          f'ORDER BY {pk_str}, "{order_column}" DESC')
+        else:
+            select_sql = f"SELECT {cols_str} FROM {staging_table}{where_source}"
+
+        where_clause = ""
+        if ROW_HASH_COLUMN in columns:
+            where_clause = f'WHERE {table_name}."{ROW_HASH_COLUMN}" IS DISTINCT FROM EXCLUDED."{ROW_HASH_COLUMN}"'
+
+        returning = ""
+        aggregate_ctes = ""
+        if aggregates:
+            # Versões antigas das linhas que o ON CONFLICT vai atualizar (mesmo critério do WHERE acima)
+            dims = IncrementalAggregates.dimensions(aggregates)
+            returning = ", " + ", ".join(f'"{c}"' for c in dims)
+            join_on = " AND ".join(f't."{c}" = s."{c}"' for c in pk_columns)
+            changed = (f' WHERE t."{ROW_HASH_COLUMN}" IS DISTINCT FROM s."{ROW_HASH_COLUMN}"'
+                       if ROW_HASH_COLUMN in columns else "")
+            aggregate_ctes = f""", previous AS (
+            SELECT {", ".join(f't."{c}"' for c in dims)}
+            FROM {table_name} t JOIN source s ON {join_on}{changed}
+        ),""" + IncrementalAggregates.delta_ctes(aggregates, added="merged", removed="previous")
+
+        # xmax = 0 identifica linhas recém-inseridas; linhas puladas pelo WHERE não são retornadas
+        sql_upsert = f"""
+        WITH source AS (
+            {select_sql}
+        ), merged AS (
+            INSERT INTO {table_name} ({cols_str})
+            SELECT {cols_str} FROM source
+            ON CONFLICT ({pk_str}) 
+            DO UPDATE SET {set_clause}
+            {where_clause}
+            RETURNING (xmax = 0) AS inserted{returning}
+        ){aggregate_ctes}
+        SELECT
+            (SELECT COUNT(*) FROM source) AS total,
+            COUNT(*) FILTER (WHERE inserted) AS inserted,
+            COUNT(*) FILTER (WHERE NOT inserted) AS updated
+        FROM merged;
+        """
+        total, inserted, updated = conn.execute(text(sql_upsert)).one()
+        counts = {"inserted": inserted, "updated": updated, "unchanged": total - inserted - updated}
+        print(f" -> Merge {table_name}: {counts['inserted']} inseridos, {counts['updated']} atualizados, "
+              f"{counts['unchanged']} inalterados.")
+        return counts
+
+    @staticmethod
+    def _partition_columns(conn, table_name):
+        """Colunas da chave de particionamento do destino (vazio se não for particionado)."""
+        return conn.execute(text(
+            "SELECT a.attname FROM pg_partitioned_table p "
+            "JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = ANY(p.partattrs::int2[]) "
+            "WHERE p.partrelid = to_regclass(:name)"
+        ), {"name": table_name}).scalars().all()
+
+    @staticmethod
+    def _is_partitioned(conn, table_name):
+        relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+                               {"name": table_name}).scalar()
+        return relkind == 'p'
+
+    @staticmethod
+    def _ensure_partitions(conn, table_name, partition_column, staging_table):
+        """
+        Cria as partições (LIST) que faltam para os valores presentes no staging.
+        Retorna os valores encontrados, que delimitam as partições tocadas pelo merge.
+        """
+        values = conn.execute(text(
+            f'SELECT DISTINCT "{partition_column}" FROM {staging_table} '
+            f'WHERE "{partition_column}" IS NOT NULL ORDER BY 1'
+        )).scalars().all()
+        for value in values:
+            value = int(value)
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table_name}_{value} "
+                              f"PARTITION OF {table_name} FOR VALUES IN ({value})"))
+        return [int(v) for v in values]
+
+    @staticmethod
+    def _ensure_hash_column(engine, table_name, db_cols, df_columns):
+        # Tabelas criadas antes do hash ganham a coluna; linhas antigas (NULL) são atualizadas uma vez
+        if ROW_HASH_COLUMN in df_columns and ROW_HASH_COLUMN not in db_cols:
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS "{ROW_HASH_COLUMN}" BIGINT'))
+            print(f" -> Coluna '{ROW_HASH_COLUMN}' adicionada em '{table_name}'.")
+            db_cols = db_cols + [ROW_HASH_COLUMN]
+        return db_cols
+
+    @staticmethod
+    def _ensure_key_column(engine, table_name, db_cols, df_columns):
+        # Tabelas criadas antes da chave empacotada ganham a coluna, preenchida no banco com a mesma regra
+        if NOTIF_KEY_COLUMN in df_columns and NOTIF_KEY_COLUMN not in db_cols:
+            print(f" -> Adicionando '{NOTIF_KEY_COLUMN}' em '{table_name}' e preenchendo as linhas existentes...")
+            with engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS "{NOTIF_KEY_COLUMN}" BIGINT'))
+                conn.execute(text(f'UPDATE {table_name} SET "{NOTIF_KEY_COLUMN}" = {notification_key_sql()}'))
+            db_cols = db_cols + [NOTIF_KEY_COLUMN]
+        return db_cols
+
+    @staticmethod
+    def upsert_dataframe(df, table_name, pk_columns=["NU_NOTIFIC", "NU_ANO"], chunksize=None, method='copy',
+                         partition_column=None, file_key=None, resume=False, aggregates=None):
         """
         Realiza UPSERT (Insert or Update) utilizando tabela de Staging para alta performance.
-        1. Carrega dados para tabela 'staging_{table_name}'.
-        2. Aplica PK na tabela destino se necessário.
-        3. Executa INSERT ... ON CONFLICT ... DO UPDATE do staging para destino.
-        4. Remove staging.
+        1. Prepara o staging UNLOGGED 'staging_{table_name}' (criado uma vez, esvaziado a cada carga).
+        2. Carrega os dados no staging (COPY por padrão; method='to_sql' como alternativa).
+        3. Analisa o staging e garante tabela destino e PK (consultando o catálogo).
+        4. Executa INSERT ... ON CONFLICT ... DO UPDATE do staging para destino e esvazia o staging.
+        Com partition_column (ex: NU_ANO), o destino novo é particionado por ano e o merge só toca
+        as partições presentes nos dados (partições que faltam são criadas).
+        Os tempos de cada fase ficam em Database.last_timings.
+        Com file_key (checksum do arquivo), cada lote do staging é registrado em LoadCheckpoint; se a carga
+        falhar o staging é mantido e, com resume=True, só os lotes que faltam são reenviados antes do merge.
+        Com aggregates (ex: CASE_AGGREGATES), as tabelas resumo '{table_name}_agg_*' são atualizadas
+        na transação do merge apenas com os deltas das linhas inseridas e atualizadas.
         """
-        from tqdm import tqdm
-        
+        from src.utils.checkpoint import LoadCheckpoint
+
         if df.empty:
             print(" -> DataFrame vazio. Nada a processar.")
             return
 
         engine = Database.get_engine()
         staging_table = f"staging_{table_name}"
+        timings = {}
+        checkpoint = None
         
         print(f" -> Iniciando UPSERT em '{table_name}' via '{staging_table}'...")
 
         try:
             # 1. Verificar colunas existentes se a tabela já existir
             # Isso garante que não tentaremos inserir colunas novas que não estão no schema físico
-            inspector = inspect(engine)
-            if inspector.has_table(table_name):
-                print(f" -> 1/5 Sincronizando colunas com o schema de '{table_name}'...")
-                db_cols = [c['name'] for c in inspector.get_columns(table_name)]
-                # Filtra o DF para ter apenas colunas que existem no banco
-                df_cols_before = set(df.columns)
-                df = df[[c for c in df.columns if c in db_cols]]
-                df_cols_after = set(df.columns)
-                
-                dropped = df_cols_before - df_cols_after
-                if dropped:
-                    print(f" -> Aviso: Ignorando colunas ausentes no banco: {dropped}")
-            else:
-                print(f" -> Tabela '{table_name}' não existe. Será criada com o schema do DataFrame.")
+            with Database._timed(timings, 'schema'):
+                db_cols = Database._get_table_columns(engine, table_name)
+                if db_cols is not None:
+                    print(f" -> 1/4 Sincronizando colunas com o schema de '{table_name}'...")
+                    db_cols = Database._ensure_hash_column(engine, table_name, db_cols, df.columns)
+                    db_cols = Database._ensure_key_column(engine, table_name, db_cols, df.columns)
+                    df = Database._sync_columns(df, db_cols)
+                else:
+                    print(f" -> Tabela '{table_name}' não existe. Será criada com o schema do DataFrame.")
+                if file_key:
+                    # Lotes adaptativos são retomados pelas faixas gravadas; fixos, pelo fatiamento
+                    layout = (f"chunksize={chunksize}" if chunksize
+                              else f"chunksize=adaptive,workers={Database.upload_workers()}")
+                    checkpoint = LoadCheckpoint(engine, table_name, file_key, layout,
+                                                total_rows=len(df), resume=resume)
+                Database._prepare_staging(engine, staging_table, df, checkpoint=checkpoint)
 
-            # 2. Carga para Staging (Replace garante limpeza prévia)
-            print(f" -> 2/5 Carregando Staging ({len(df)} registros)...")
-            Database.load_dataframe(df, staging_table, if_exists='replace', chunksize=chunksize)
+            # 2. Carga para Staging
+            print(f" -> 2/4 Carregando Staging ({len(df)} registros)...")
+            with Database._timed(timings, 'staging', rows=len(df)):
+                Database.load_dataframe(df, staging_table, if_exists='append', chunksize=chunksize, method=method,
+                                        checkpoint=checkpoint)
 
-            with engine.begin() as conn:
-                # 3. Garantir que Tabela Destino exista
-                print(" -> 3/5 Verificando/Criando tabela destino...")
-                conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table_name} (LIKE {staging_table} INCLUDING ALL)"))
-                
-                # 3.1 Garantir Primary Key
-                pk_str = ", ".join([f'"{c}"' for c in pk_columns])
-                try:
-                    conn.execute(text(f"ALTER TABLE {table_name} ADD PRIMARY KEY ({pk_str})"))
-                    print(f" -> PK ({pk_str}) adicionada.")
-                except:
-                    pass 
-
-                # 4. Executar o MERGE (UPSERT)
-                print(" -> 4/5 Executando Merge (INSERT ... ON CONFLICT)...")
-                cols_str = ", ".join([f'"{c}"' for c in df.columns])
-                update_cols = [c for c in df.columns if c not in pk_columns]
-                set_clause = ", ".join([f'"{c}" = EXCLUDED."{c}"' for c in update_cols])
-                
-                sql_upsert = f"""
-                INSERT INTO {table_name} ({cols_str})
-                SELECT {cols_str} FROM {staging_table}
-                ON CONFLICT ({pk_str}) 
-                DO UPDATE SET {set_clause};
-                """
-                conn.execute(text(sql_upsert))
-                
-                # 5. Limpeza
-                print(" -> 5/5 Removendo tabela de Staging...")
-                conn.execute(text(f"DROP TABLE {staging_table}"))
-                
+            # 3 e 4. Analyze, destino/PK e Merge
+            print(" -> 3/4 Analisando staging e verificando tabela destino...")
+            print(" -> 4/4 Executando Merge (INSERT ... ON CONFLICT)...")
+            counts = Database._finish_upsert(engine, table_name, staging_table, list(df.columns), pk_columns, timings,
+                                             partition_column=partition_column, checkpoint=checkpoint,
+                                             aggregates=aggregates)
+
+            Database.last_timings = timings
+            Database._print_timings(timings)
             print(f" -> UPSERT concluído com sucesso em '{table_name}'.")
+            return counts
 
         except Exception as e:
             print(f" -> ERRO Crítico no UPSERT: {e}")
-            # Tenta limpar staging em caso de erro, se possível (nova conexão fora da transação falha)
-            try:
-                with engine.begin() as clean_conn:
-                    clean_conn.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
-            except:
-                pass
-            raise e
\ No newline at end of file
+            Database._abort_staging(engine, staging_table, checkpoint)
+            raise e
+
+    @staticmethod
+    def upsert_batches(batches, table_name, pk_columns=["NU_NOTIFIC", "NU_ANO"], method='copy',
+                       partition_column=None, file_key=None, resume=False, batch_rows=None, aggregates=None):
+        """
+        UPSERT em modo streaming: cada lote vai direto para o staging, sem juntar o arquivo em memória.
+        Duplicatas entre lotes são resolvidas no merge pela coluna de ordem (última ocorrência vence).
+        Com file_key, os lotes gravados são registrados em LoadCheckpoint (identificados pela posição no
+        arquivo); na retomada todos os lotes são lidos de novo, mas só os que faltam vão para o staging.
+        aggregates: tabelas resumo mantidas pelo merge, como em upsert_dataframe.
+        """
+        from tqdm import tqdm
+        import math
+        from src.utils.checkpoint import LoadCheckpoint
+
+        engine = Database.get_engine()
+        workers = Database.upload_workers()
+        staging_table = f"staging_{table_name}"
+        order_column = Database.STAGING_ORDER_COLUMN
+        timings = {}
+        checkpoint = None
+
+        print(f" -> Iniciando UPSERT em lotes em '{table_name}' via '{staging_table}'...")
+
+        try:
+            db_cols = Database._get_table_columns(engine, table_name)
+            if db_cols is None:
+                print(f" -> Tabela '{table_name}' não existe. Será criada com o schema do primeiro lote.")
+            if file_key:
+                # As fatias dependem do tamanho do lote e do número de conexões
+                checkpoint = LoadCheckpoint(engine, table_name, file_key,
+                                            f"batch_rows={batch_rows},workers={workers}", resume=resume)
+
+            # 1. Carga dos lotes para o Staging (o primeiro lote prepara a tabela)
+            total_rows = 0
+            columns = None
+            batch_iter = iter(batches)
+            with tqdm(unit="rows", desc=f"Staging {table_name}") as pbar:
+                while True:
+                    # Leitura/transformação do lote também é medida (o gerador é preguiçoso)
+                    with Database._timed(timings, 'leitura'):
+                        batch = next(batch_iter, None)
+                    if batch is None:
+                        break
+                    if batch.empty:
+                        continue
+                    if db_cols is not None:
+                        db_cols = Database._ensure_hash_column(engine, table_name, db_cols, batch.columns)
+                        db_cols = Database._ensure_key_column(engine, table_name, db_cols, batch.columns)
+                        batch = Database._sync_columns(batch, db_cols)
+
+                    batch = batch.assign(**{order_column: range(total_rows, total_rows + len(batch))})
+                    with Database._timed(timings, 'staging', rows=len(batch)):
+                        if columns is None:
+                            columns = [c for c in batch.columns if c != order_column]
+                            Database._prepare_staging(engine, staging_table, batch, checkpoint=checkpoint)
+                        if workers > 1:
+                            # O lote é dividido entre as conexões
+                            Database._write_chunks_parallel(engine, batch, staging_table,
+                                                            max(math.ceil(len(batch) / workers), 1),
+                                                            False, method, workers, pbar,
+                                                            checkpoint=checkpoint, base_start=total_rows)
+                        elif checkpoint is not None and checkpoint.is_done(total_rows):
+                            pbar.update(len(batch))
+                        else:
+                            Database._write_chunk(engine, batch, staging_table, 'append',
+                                                  index=False, method=method, create_table=False,
+                                                  checkpoint=checkpoint, chunk_start=total_rows)
+                            pbar.update(len(batch))
+                    total_rows += len(batch)
+
+            if total_rows == 0:
+                print(" -> Nenhum registro nos lotes. Nada a processar.")
+                return
+
+            # 2. Analyze, destino/PK e Merge com deduplicação entre lotes
+            print(f" -> Executando Merge de {total_rows} registros (INSERT ... ON CONFLICT)...")
+            counts = Database._finish_upsert(engine, table_name, staging_table, columns, pk_columns, timings,
+                                             order_column=order_column, partition_column=partition_column,
+                                             checkpoint=checkpoint, aggregates=aggregates)
+
+            Database.last_timings = timings
+            Database._print_timings(timings)
+            print(f" -> UPSERT em lotes concluído com sucesso em '{table_name}'.")
+            return counts
+
+        except Exception as e:
+            print(f" -> ERRO Crítico no UPSERT em lotes: {e}")
+            Database._abort_staging(engine, staging_table, checkpoint)
+            raise e
@@ -0,0 +1,399 @@
+import os
+import struct
+from dataclasses import dataclass
+from datetime import date
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional
+
+import numpy as np
+
+# pandas só é importado ao montar DataFrames: a leitura do cabeçalho (read --inspect) não depende dele
+if TYPE_CHECKING:
+    import pandas as pd
+
+from src.utils.compressed import is_compressed, open_dbf_stream
+
+
+@dataclass(frozen=True)
+class DBFField:
+    """Descritor de um campo do DBF."""
+    name: str
+    type: str
+    length: int
+    decimal_count: int
+    offset: int  # Posição do campo dentro do registro (o byte 0 é a flag de exclusão)
+
+
+@dataclass(frozen=True)
+class DBFHeader:
+    """Cabeçalho do DBF (dBase III / SINAN)."""
+    version: int
+    last_update: Optional[date]
+    record_count: int
+    header_length: int
+    record_length: int
+    language_driver: int
+    fields: List[DBFField]
+
+
+class DBFReader:
+    """
+    Leitor colunar de arquivos DBF.
+    Como os registros têm largura fixa, cada bloco de registros é lido de uma vez
+    para um array NumPy (n_registros x largura) e cada campo é decodificado
+    coluna a coluna, sem criar um dict Python por registro.
+    Entradas .dbc/.zip/.gz são lidas como stream descompactado (sem arquivo temporário);
+    nelas não há acesso aleatório, então read_range/read_parallel leem sequencialmente.
+    """
+
+    DEFAULT_BLOCK_SIZE = 100_000
+
+    # Flags do primeiro byte de cada registro
+    _LIVE = 0x20     # ' ' registro válido
+    _DELETED = 0x2A  # '*' registro excluído
+
+    def __init__(self, file_path: str, encoding: str = 'latin-1', columns: Optional[List[str]] = None):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.streamed = is_compressed(file_path)
+        with open_dbf_stream(file_path) as f:
+            self.header = self.read_header(f, encoding)
+
+        # Projeção: apenas os campos pedidos são decodificados (os demais bytes são ignorados)
+        if columns is None:
+            self.selected_fields = list(self.header.fields)
+        else:
+            wanted = set(columns)
+            self.selected_fields = [f for f in self.header.fields if f.name in wanted]
+
+        if self.streamed:
+            # Tamanho descompactado desconhecido: um stream truncado apenas encerra a leitura antes
+            self.record_count = self.header.record_count
+        else:
+            # Ajusta a contagem pelo tamanho real do arquivo (cabeçalhos corrompidos/truncados)
+            available = max(os.path.getsize(file_path) - self.header.header_length, 0)
+            self.record_count = min(self.header.record_count, available // self.header.record_length)
+
+    @property
+    def fields(self) -> List[DBFField]:
+        return self.header.fields
+
+    @staticmethod
+    def read_header(stream: BinaryIO, encoding: str = 'latin-1') -> DBFHeader:
+        """
+        Lê o cabeçalho e os descritores de campo de forma sequencial
+        (não depende de seek, funciona também com streams).
+        """
+        head = stream.read(32)
+        if len(head) < 32:
+            raise ValueError("Arquivo DBF inválido: cabeçalho incompleto.")
+
+        version, yy, mm, dd, record_count, header_length, record_length = struct.unpack('<BBBBIHH', head[:12])
+        language_driver = head[29]
+        try:
+            last_update = date(1900 + yy, mm, dd)
+        except ValueError:
+            last_update = None
+
+        fields = []
+        offset = 1
+        consumed = 32
+        while True:
+            first = stream.read(1)
+            consumed += 1
+            if first in (b'\r', b''):
+                break
+            descriptor = first + stream.read(31)
+            consumed += 31
+            if len(descriptor) < 32:
+                raise ValueError("Arquivo DBF inválido: descritor de campo incompleto.")
+
+            name = descriptor[:11].split(b'\0')[0].decode(encoding).strip()
+            field_type = chr(descriptor[11])
+            length = descriptor[16]
+            decimal_count = descriptor[17]
+            fields.append(DBFField(name, field_type, length, decimal_count, offset))
+            offset += length
+
+        # Pula o restante do cabeçalho (alguns geradores deixam bytes extras após o terminador)
+        if header_length > consumed:
+            stream.read(header_length - consumed)
+
+        if record_length <= 0:
+            raise ValueError("Arquivo DBF inválido: tamanho de registro zerado.")
+
+        return DBFHeader(
+            version=version,
+            last_update=last_update,
+            record_count=record_count,
+            header_length=header_length,
+            record_length=record_length,
+            language_driver=language_driver,
+            fields=fields,
+        )
+
+    # ------------------------------------------------------------------
+    # Leitura em blocos
+    # ------------------------------------------------------------------
+
+    def _open_records(self) -> BinaryIO:
+        """Stream posicionado no primeiro registro."""
+        f = open_dbf_stream(self.file_path)
+        if self.streamed:
+            f.read(self.header.header_length)
+        else:
+            f.seek(self.header.header_length)
+        return f
+
+    def _iter_raw_blocks(self, block_size: int) -> Iterator[bytes]:
+        record_length = self.header.record_length
+        remaining = self.record_count
+        with self._open_records() as f:
+            while remaining > 0:
+                n = min(block_size, remaining)
+                raw = f.read(n * record_length)
+                n = len(raw) // record_length
+                if n == 0:
+                    break
+                yield raw[: n * record_length]
+                remaining -= n
+
+    def iter_blocks(self, block_size: Optional[int] = None) -> Iterator["pd.DataFrame"]:
+        """Itera o arquivo em DataFrames de até `block_size` registros."""
+        for raw in self._iter_raw_blocks(block_size or self.DEFAULT_BLOCK_SIZE):
+            yield self.decode_records(raw)
+
+    def read(self, block_size: Optional[int] = None, progress: bool = True) -> "pd.DataFrame":
+        """Lê o arquivo inteiro, reportando progresso por bloco."""
+        import pandas as pd
+        from tqdm import tqdm
+
+        block_size = block_size or self.DEFAULT_BLOCK_SIZE
+        record_length = self.header.record_length
+        frames = []
+        with tqdm(total=self.record_count, unit="rows", desc=f"Lendo {os.path.basename(self.file_path)}",
+                  disable=not progress) as pbar:
+            for raw in self._iter_raw_blocks(block_size):
+                frames.append(self.decode_records(raw))
+                pbar.update(len(raw) // record_length)
+
+        if not frames:
+            return self.decode_records(b'')
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True, copy=False)
+
+    def read_range(self, start: int, count: int) -> "pd.DataFrame":
+        """Decodifica os registros [start, start + count) (índices físicos, incluindo excluídos)."""
+        record_length = self.header.record_length
+        count = max(min(count, self.record_count - start), 0)
+        with self._open_records() as f:
+            if self.streamed:
+                # Sem seek: descarta os registros anteriores em blocos
+                skip = start * record_length
+                while skip > 0:
+                    skipped = len(f.read(min(skip, 1 << 24)))
+                    if skipped == 0:
+                        break
+                    skip -= skipped
+            else:
+                f.seek(start * record_length, os.SEEK_CUR)
+            raw = f.read(count * record_length)
+        return self.decode_records(raw[: (len(raw) // record_length) * record_length])
+
+    def read_head(self, count: int) -> "pd.DataFrame":
+        """Decodifica os primeiros `count` registros válidos (excluídos não contam; lê além deles até o EOF)."""
+        record_length = self.header.record_length
+        parts = []
+        taken = 0
+        if count > 0:
+            for raw in self._iter_raw_blocks(count):
+                records = np.frombuffer(raw, dtype=np.uint8).reshape(-1, record_length)
+                live = records[records[:, 0] == self._LIVE][: count - taken]
+                parts.append(live.tobytes())
+                taken += len(live)
+                if taken >= count:
+                    break
+        return self.decode_records(b''.join(parts))
+
+    def read_sample(self, count: int, seed: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Decodifica `count` registros válidos em posições aleatórias (em ordem de arquivo).
+        Com registros de largura fixa cada posição é um seek; em entradas compactadas
+        o stream é percorrido até a última posição sorteada. Posições que caem em registros
+        excluídos são repostas por novos sorteios entre as ainda não lidas, até `count` ou o fim.
+        """
+        rng = np.random.default_rng(seed)
+        chosen = {}
+        tried = None
+        limit = self.record_count
+        offsets = rng.choice(self.record_count, size=min(count, self.record_count), replace=False)
+        while len(offsets):
+            records, end = self._read_at(np.sort(offsets))
+            limit = min(limit, end)
+            chosen.update((offset, record) for offset, record in records if record[0] == self._LIVE)
+            missing = count - len(chosen)
+            if missing <= 0:
+                break
+            if tried is None:
+                tried = np.zeros(self.record_count, dtype=bool)
+            tried[offsets] = True
+            pool = np.flatnonzero(~tried[:limit])
+            offsets = rng.choice(pool, size=min(missing, len(pool)), replace=False)
+        return self.decode_records(b''.join(chosen[offset] for offset in sorted(chosen)))
+
+    def _read_at(self, offsets: np.ndarray):
+        """
+        Lê os registros nas posições `offsets` (crescentes). Retorna [(posição, bytes)] e a posição
+        em que o arquivo acabou (record_count se não acabou antes: stream truncado).
+        """
+        record_length = self.header.record_length
+        records = []
+        with self._open_records() as f:
+            position = 0
+            for offset in offsets:
+                skip = (int(offset) - position) * record_length
+                if self.streamed:
+                    while skip > 0:
+                        skipped = len(f.read(min(skip, 1 << 24)))
+                        if skipped == 0:
+                            break
+                        skip -= skipped
+                else:
+                    f.seek(skip, os.SEEK_CUR)
+                record = f.read(record_length)
+                if len(record) < record_length:
+                    return records, int(offset)
+                records.append((int(offset), record))
+                position = int(offset) + 1
+        return records, self.record_count
+
+    def guess_encoding(self, sample_records: int = 1000) -> str:
+        """
+        Palpite de codificação: byte de idioma do cabeçalho, se houver, ou o conteúdo dos campos texto
+        de uma amostra do início (ASCII puro, UTF-8 válido, cp1252 se houver bytes 0x80-0x9F, que em
+        latin-1 são caracteres de controle, ou, no padrão do SINAN, latin-1).
+        """
+        by_driver = _LANGUAGE_DRIVERS.get(self.header.language_driver)
+        if by_driver:
+            return by_driver
+        with self._open_records() as f:
+            raw = f.read(sample_records * self.header.record_length)
+        text_fields = [fd for fd in self.header.fields if fd.type in ('C', 'M')]
+        records = np.frombuffer(raw[: len(raw) - len(raw) % self.header.record_length], dtype=np.uint8)
+        records = records.reshape(-1, self.header.record_length)
+        content = b''.join(records[:, fd.offset: fd.offset + fd.length].tobytes() for fd in text_fields)
+        if max(content, default=0) < 0x80:
+            return 'ascii'
+        try:
+            content.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError:
+            pass
+        if any(0x80 <= byte <= 0x9F for byte in content):
+            try:
+                content.decode('cp1252')
+                return 'cp1252'
+            except UnicodeDecodeError:
+                pass
+        return 'latin-1'
+
+    def read_parallel(self, workers: int, block_size: Optional[int] = None, progress: bool = True) -> "pd.DataFrame":
+        """
+        Lê o arquivo dividindo-o em faixas de registros decodificadas em processos separados.
+        As faixas são concatenadas na ordem do arquivo, então a ordem dos registros
+        (e o keep='last' da deduplicação) é a mesma da leitura sequencial.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        import pandas as pd
+        from tqdm import tqdm
+
+        block_size = block_size or self.DEFAULT_BLOCK_SIZE
+        # Em entradas compactadas a descompressão é sequencial: faixas em paralelo só repetiriam o trabalho
+        if workers <= 1 or self.record_count <= block_size or self.streamed:
+            return self.read(block_size, progress=progress)
+
+        # Faixas do tamanho de um bloco: mais faixas que processos equilibra a carga
+        columns = [f.name for f in self.selected_fields]
+        starts = range(0, self.record_count, block_size)
+        frames = []
+        with ProcessPoolExecutor(max_workers=workers) as executor, \
+                tqdm(total=self.record_count, unit="rows", desc=f"Lendo {os.path.basename(self.file_path)}",
+                     disable=not progress) as pbar:
+            args = [(self.file_path, self.encoding, columns, start, block_size) for start in starts]
+            for start, frame in zip(starts, executor.map(_read_range, args)):
+                frames.append(frame)
+                pbar.update(min(block_size, self.record_count - start))
+
+        return pd.concat(frames, ignore_index=True, copy=False)
+
+    # ------------------------------------------------------------------
+    # Decodificação colunar
+    # ------------------------------------------------------------------
+
+    def decode_records(self, raw: bytes) -> "pd.DataFrame":
+        """
+        Decodifica um buffer de registros completos em um DataFrame tipado.
+        Registros marcados como excluídos são descartados (mesmo comportamento do dbfread).
+        """
+        import pandas as pd
+
+        record_length = self.header.record_length
+        records = np.frombuffer(raw, dtype=np.uint8).reshape(-1, record_length)
+        live = records[:, 0] == self._LIVE
+        # Sem registros excluídos não há cópia: cada campo é uma fatia do buffer
+        rows = slice(None) if live.all() else live
+
+        data = {}
+        for field in self.selected_fields:
+            chunk = records[rows, field.offset: field.offset + field.length]
+            data[field.name] = self._decode_field(field, chunk)
+        return pd.DataFrame(data, index=pd.RangeIndex(int(live.sum())), copy=False)
+
+    def _decode_field(self, field: DBFField, chunk: np.ndarray):
+        import pandas as pd
+
+        field_type = field.type
+        if field_type == 'D':
+            text = np.char.strip(self._to_text(chunk), ' \x00')
+            return pd.to_datetime(text, format='%Y%m%d', errors='coerce').values
+        if field_type in ('N', 'F'):
+            text = np.char.strip(self._to_text(chunk), ' *\x00')
+            if field.decimal_count:
+                text = np.char.replace(text, ',', '.')
+            return pd.to_numeric(text, errors='coerce')
+        if field_type == 'L':
+            first = chunk[:, 0] if chunk.shape[1] else np.zeros(len(chunk), dtype=np.uint8)
+            true_mask = np.isin(first, np.frombuffer(b'TtYy', dtype=np.uint8))
+            false_mask = np.isin(first, np.frombuffer(b'FfNn', dtype=np.uint8))
+            return pd.arrays.BooleanArray(true_mask, ~(true_mask | false_mask))
+        if field_type in ('I', '+') and field.length == 4:
+            return np.ascontiguousarray(chunk).view('<i4').ravel().astype(np.int64)
+        if field_type == 'O' and field.length == 8:
+            return np.ascontiguousarray(chunk).view('<f8').ravel()
+
+        # 'C' e demais tipos (memo não é resolvido, fica o conteúdo bruto do campo)
+        return np.char.rstrip(self._to_text(chunk), ' \x00').astype(object)
+
+    def _to_text(self, chunk: np.ndarray) -> np.ndarray:
+        n, length = chunk.shape
+        if length == 0:
+            return np.full(n, '', dtype='U1')
+
+        if self.encoding.lower().replace('_', '-') in ('latin-1', 'latin1', 'iso-8859-1', 'iso8859-1'):
+            # Em latin-1 cada byte é exatamente um code point: basta alargar para UCS-4
+            return np.ascontiguousarray(chunk, dtype=np.uint32).view(f'U{length}').ravel()
+        return np.char.decode(np.ascontiguousarray(chunk).view(f'S{length}').ravel(), self.encoding)
+
+
+# Byte 29 do cabeçalho (language driver ID) -> codificação; 0 = não informado
+_LANGUAGE_DRIVERS = {
+    0x01: 'cp437', 0x02: 'cp850', 0x03: 'cp1252', 0x57: 'cp1252', 0x58: 'cp1252', 0x59: 'cp1252',
+    0x64: 'cp852', 0x65: 'cp865', 0x66: 'cp866', 0x7D: 'cp1255', 0x7E: 'cp1256', 0xC8: 'cp1250',
+    0xC9: 'cp1251', 0xCA: 'cp1254', 0xCB: 'cp1253',
+}
+
+
+def _read_range(args) -> "pd.DataFrame":
+    # Executado no processo filho: cada faixa abre o arquivo e relê o cabeçalho (barato)
+    file_path, encoding, columns, start, count = args
+    return DBFReader(file_path, encoding=encoding, columns=columns).read_range(start, count)
@@ -0,0 +1,75 @@
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Optional, Sequence
+
+# pandas só é importado no hash de linhas: file_checksum (manifesto) não depende dele
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Coluna com o hash do conteúdo de cada registro (usada para pular linhas inalteradas no merge)
+ROW_HASH_COLUMN = "ROW_HASH"
+
+
+def add_row_hash(df: "pd.DataFrame", column: str = ROW_HASH_COLUMN,
+                 exclude: Sequence[str] = ()) -> "pd.DataFrame":
+    """
+    Acrescenta um hash de 64 bits do conteúdo de cada linha (todas as colunas, sem o índice).
+    exclude: colunas derivadas que não entram no hash (ex: a chave empacotada, que só repete a PK).
+    O valor é gravado como BIGINT com sinal, que é o tipo inteiro de 8 bytes do PostgreSQL.
+    """
+    import pandas as pd
+
+    content = df.drop(columns=[column, *exclude], errors='ignore')
+    hashes = pd.util.hash_pandas_object(content, index=False).to_numpy()
+    df[column] = hashes.view('int64')
+    return df
+
+
+def file_checksum(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """BLAKE2b (128 bits) do conteúdo do arquivo, lido em blocos de 1 MiB."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_checksum_index(index_path: str) -> dict:
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_checksum_index(index_path: str, index: dict):
+    # Escrita atômica: processos paralelos podem perder uma atualização, nunca corromper o índice
+    directory = os.path.dirname(index_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+
+def cached_file_checksum(file_path: str, index_path: Optional[str] = None) -> str:
+    """
+    file_checksum memoizado por (tamanho, mtime) em um índice JSON compartilhado (Config.CHECKSUM_INDEX_PATH).
+    Cache Parquet, manifesto e checkpoint da carga usam o mesmo índice: o arquivo só é lido de novo quando muda.
+    """
+    if index_path is None:
+        from config import Config
+        index_path = Config.CHECKSUM_INDEX_PATH
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    index = _load_checksum_index(index_path)
+    entry = index.get(abs_path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['checksum']
+
+    checksum = file_checksum(abs_path)
+    index[abs_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'checksum': checksum}
+    _save_checksum_index(index_path, index)
+    return checksum
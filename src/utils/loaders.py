@@ -1,6 +1,9 @@
-import pandas as pd
-from dbfread import DBF
 import os
+from typing import TYPE_CHECKING, Iterator, List, Optional
+from src.utils.dbf_reader import DBFReader
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class FileLoader:
     """
@@ -9,14 +12,95 @@ class FileLoader:
     """
 
     @staticmethod
-    def load_csv(file_path: str, **kwargs) -> pd.DataFrame:
+    def load_csv(file_path: str, **kwargs) -> "pd.DataFrame":
+        import pandas as pd
+
         try:
             return pd.read_csv(file_path, **kwargs)
         except Exception as e:
             raise Exception(f"Erro de I/O CSV: {e}")
 
     @staticmethod
-    def load_dbf(file_path: str) -> pd.DataFrame:
+    def load_dbf(file_path: str, engine: str = 'native', columns: Optional[List[str]] = None,
+                 workers: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Lê um DBF para DataFrame.
+        engine='native' usa o leitor colunar (DBFReader); engine='dbfread' mantém
+        o caminho antigo registro a registro (usado como fallback e no benchmark).
+        columns restringe a leitura aos campos informados (os demais nem são decodificados).
+        workers > 1 decodifica faixas de registros em paralelo (padrão: variável DBF_WORKERS, ou 1).
+        """
+        if workers is None:
+            workers = int(os.getenv('DBF_WORKERS', '1'))
+
+        if engine == 'dbfread':
+            df = FileLoader._load_dbf_dbfread(file_path)
+            if columns is not None:
+                df = df[[c for c in df.columns if c in set(columns)]]
+            return df
+
+        try:
+            # latin-1 decodifica qualquer byte: cp1252 só é usado quando o cabeçalho ou a amostra indicam
+            reader = DBFReader(file_path, encoding='latin-1', columns=columns)
+            print(f" -> Lendo {reader.record_count} registros do arquivo DBF...")
+            if reader.guess_encoding() != 'cp1252':
+                return reader.read_parallel(workers)
+            try:
+                return DBFReader(file_path, encoding='cp1252', columns=columns).read_parallel(workers)
+            except UnicodeDecodeError:
+                # Byte fora da amostra sem correspondente em cp1252 (0x81, 0x8D, 0x8F, 0x90, 0x9D)
+                return reader.read_parallel(workers)
+
+        except Exception as e:
+            raise Exception(f"Erro de I/O DBF: {e}")
+
+    @staticmethod
+    def inspect_dbf(file_path: str) -> dict:
+        """Metadados do DBF lidos só do cabeçalho (e de uma amostra pequena para a codificação)."""
+        reader = DBFReader(file_path, encoding='latin-1')
+        header = reader.header
+        return {
+            "file": file_path,
+            "size_bytes": os.path.getsize(file_path),
+            "version": header.version,
+            "last_update": header.last_update,
+            "record_count": header.record_count,
+            "readable_records": reader.record_count,
+            "header_length": header.header_length,
+            "record_length": header.record_length,
+            "encoding_guess": reader.guess_encoding(),
+            "fields": [(f.name, f.type, f.length, f.decimal_count) for f in header.fields],
+        }
+
+    @staticmethod
+    def preview_dbf(file_path: str, rows: int, sample: bool = False, columns: Optional[List[str]] = None,
+                    seed: Optional[int] = None) -> "pd.DataFrame":
+        """
+        Decodifica apenas `rows` registros: os primeiros ou, com sample, posições aleatórias.
+        O custo depende de `rows`, não do tamanho do arquivo (exceto em entradas compactadas).
+        """
+        try:
+            reader = DBFReader(file_path, encoding='latin-1', columns=columns)
+            return reader.read_sample(rows, seed=seed) if sample else reader.read_head(rows)
+        except Exception as e:
+            raise Exception(f"Erro de I/O DBF: {e}")
+
+    @staticmethod
+    def iter_dbf(file_path: str, batch_rows: int, columns: Optional[List[str]] = None) -> Iterator["pd.DataFrame"]:
+        """
+        Lê um DBF em lotes de até `batch_rows` registros (memória proporcional ao lote, não ao arquivo).
+        """
+        try:
+            reader = DBFReader(file_path, encoding='latin-1', columns=columns)
+            print(f" -> Lendo {reader.record_count} registros do arquivo DBF em lotes de {batch_rows}...")
+            yield from reader.iter_blocks(batch_rows)
+        except Exception as e:
+            raise Exception(f"Erro de I/O DBF: {e}")
+
+    @staticmethod
+    def _load_dbf_dbfread(file_path: str) -> "pd.DataFrame":
+        import pandas as pd
+        from dbfread import DBF
         from tqdm import tqdm
         try:
             # Primeiro, abrimos sem carregar para contar registros (rápido em dbfread)
@@ -44,4 +128,4 @@ class FileLoader:
             return pd.DataFrame(data)
 
         except Exception as e:
-            raise Exception(f"Erro de I/O DBF: {e}")
\ No newline at end of file
+            raise Exception(f"Erro de I/O DBF: {e}")
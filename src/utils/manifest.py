@@ -0,0 +1,97 @@
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from src.utils.hashing import cached_file_checksum
+
+
+class IngestionManifest:
+    """
+    Registro local (SQLite) dos arquivos já carregados, por destino (--sink).
+    Permite que o modo auto pule extrações que não mudaram desde a última execução no mesmo destino.
+    """
+
+    COLUMNS = "path, sink, prefix, size, mtime, checksum, row_count, loaded_at"
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with self._connect() as conn:
+            legacy = conn.execute("SELECT 1 FROM sqlite_master "
+                                  "WHERE type = 'table' AND name = 'ingested_files'").fetchone()
+            if legacy and 'sink' not in [row[1] for row in conn.execute("PRAGMA table_info(ingested_files)")]:
+                # Manifesto anterior aos destinos: a chave era só o caminho e toda carga ia para o PostgreSQL
+                conn.execute("ALTER TABLE ingested_files RENAME TO ingested_files_legacy")
+            else:
+                legacy = None
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingested_files (
+                    path TEXT NOT NULL,
+                    sink TEXT NOT NULL,
+                    prefix TEXT,
+                    size INTEGER NOT NULL,
+                    mtime REAL NOT NULL,
+                    checksum TEXT NOT NULL,
+                    row_count INTEGER,
+                    loaded_at TEXT NOT NULL,
+                    PRIMARY KEY (path, sink)
+                )
+            """)
+            if legacy:
+                conn.execute(f"INSERT INTO ingested_files ({self.COLUMNS}) "
+                             f"SELECT path, 'postgres', prefix, size, mtime, checksum, row_count, loaded_at "
+                             f"FROM ingested_files_legacy")
+                conn.execute("DROP TABLE ingested_files_legacy")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:  # commit/rollback
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, file_path: str, sink: str = 'postgres') -> Optional[dict]:
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM ingested_files WHERE path = ? AND sink = ?",
+                               (os.path.abspath(file_path), sink)).fetchone()
+        return dict(row) if row else None
+
+    def is_ingested(self, file_path: str, sink: str = 'postgres') -> bool:
+        """
+        Verifica se o arquivo já foi carregado no destino.
+        Tamanho e mtime iguais bastam (sem ler o arquivo); se só o mtime mudou, o checksum decide.
+        """
+        entry = self.get(file_path, sink)
+        if entry is None:
+            return False
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime == entry['mtime']:
+            return True
+
+        if cached_file_checksum(file_path) != entry['checksum']:
+            return False
+        # Conteúdo idêntico (ex: arquivo copiado novamente): atualiza o mtime para a próxima verificação
+        with self._connect() as conn:
+            conn.execute("UPDATE ingested_files SET mtime = ? WHERE path = ? AND sink = ?",
+                         (stat.st_mtime, entry['path'], sink))
+        return True
+
+    def record(self, file_path: str, prefix: str, row_count: Optional[int], sink: str = 'postgres'):
+        """Registra (ou atualiza) um arquivo carregado com sucesso no destino."""
+        stat = os.stat(file_path)
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO ingested_files ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(file_path), sink, prefix, stat.st_size, stat.st_mtime,
+                 cached_file_checksum(file_path), row_count, datetime.now().isoformat(timespec='seconds')),
+            )
@@ -0,0 +1,33 @@
+import pandas as pd
+
+
+def widen(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Versão "larga" do DataFrame, como era antes da compactação de tipos:
+    categorias voltam a texto (object) e inteiros anuláveis voltam a Int64.
+    """
+    wide = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            wide[col] = df[col].astype(object)
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_integer_dtype(dtype):
+            wide[col] = df[col].astype('Int64')
+        else:
+            wide[col] = df[col]
+    return pd.DataFrame(wide, index=df.index)
+
+
+def memory_report(df: pd.DataFrame) -> str:
+    """Tabela com a memória por coluna antes (tipos largos) e depois (tipos compactos)."""
+    before = widen(df).memory_usage(deep=True, index=False)
+    after = df.memory_usage(deep=True, index=False)
+
+    lines = [f"{'Coluna':<18} {'Tipo':<16} {'Antes (KiB)':>12} {'Depois (KiB)':>13} {'Redução':>8}"]
+    for col in df.columns:
+        ratio = before[col] / after[col] if after[col] else 0
+        lines.append(f"{col:<18} {str(df[col].dtype):<16} {before[col] / 1024:12,.1f} "
+                     f"{after[col] / 1024:13,.1f} {ratio:7.1f}x")
+    total_before, total_after = before.sum(), after.sum()
+    lines.append(f"{'TOTAL':<18} {'':<16} {total_before / 1024:12,.1f} {total_after / 1024:13,.1f} "
+                 f"{total_before / total_after if total_after else 0:7.1f}x")
+    return "\n".join(lines)
@@ -0,0 +1,278 @@
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de RSS
+    resource = None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de memória residente do processo até agora (ru_maxrss: KB no Linux, bytes no macOS)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    divisor = 1024 * 1024 if os.uname().sysname == 'Darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+@dataclass
+class StageRecord:
+    """Medidas acumuladas de uma etapa em um arquivo (somadas a cada execução da etapa)."""
+    file: str
+    stage: str
+    calls: int = 0
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    peak_rss_mb: Optional[float] = None
+    traced_peak_mb: Optional[float] = None
+
+    def add_rows(self, attr: str, rows: Optional[int]):
+        if rows is not None:
+            setattr(self, attr, (getattr(self, attr) or 0) + rows)
+
+    @property
+    def rows_per_second(self) -> Optional[float]:
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        if rows is None or self.seconds <= 0:
+            return None
+        return round(rows / self.seconds, 1)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data['seconds'] = round(self.seconds, 4)
+        data['rows_per_second'] = self.rows_per_second
+        return data
+
+
+class _StageHandle:
+    """Devolvido por RunMetrics.stage: permite informar as linhas de saída ao fim da etapa."""
+
+    def __init__(self, rows_in: Optional[int]):
+        self.rows_in = rows_in
+        self.rows_out = None
+
+
+class RunMetrics:
+    """
+    Instrumentação leve por etapa (leitura, conversões, faixa etária, dedup, staging, merge...).
+    Mede tempo, linhas de entrada/saída, pico de RSS e, opcionalmente, pico do tracemalloc; gera o relatório
+    da execução em JSON e, se pedido, um arquivo no formato texto do Prometheus.
+    Sem execução ativa (RunMetrics.start), RunMetrics.stage não mede nada.
+    """
+
+    _active: Optional["RunMetrics"] = None
+
+    def __init__(self, command: str, trace_memory: bool = False, profile_stage: Optional[str] = None):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self.records: Dict[Tuple[str, str], StageRecord] = {}
+        self.current_file = ""
+        self._profiler = None
+        # Picos do tracemalloc das etapas abertas (etapas aninhadas não apagam o pico da externa)
+        self._traced_peaks = []
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def start(cls, command: str, trace_memory: bool = False, profile_stage: Optional[str] = None) -> "RunMetrics":
+        if trace_memory:
+            import tracemalloc
+            tracemalloc.start()
+        metrics = cls(command, trace_memory=trace_memory, profile_stage=profile_stage)
+        if profile_stage:
+            import cProfile
+            metrics._profiler = cProfile.Profile()
+        cls._active = metrics
+        return metrics
+
+    @classmethod
+    def active(cls) -> Optional["RunMetrics"]:
+        return cls._active
+
+    def stop(self):
+        if self.trace_memory:
+            import tracemalloc
+            tracemalloc.stop()
+        if RunMetrics._active is self:
+            RunMetrics._active = None
+
+    @classmethod
+    @contextmanager
+    def file_scope(cls, file_path: str):
+        """Atribui as etapas executadas dentro do bloco ao arquivo informado."""
+        metrics = cls._active
+        if metrics is None:
+            yield
+            return
+        previous = metrics.current_file
+        metrics.current_file = os.path.basename(file_path)
+        try:
+            yield
+        finally:
+            metrics.current_file = previous
+
+    # ------------------------------------------------------------------
+    # Medição
+    # ------------------------------------------------------------------
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name: str, rows_in: Optional[int] = None):
+        """
+        Mede a etapa `name`. Uso:
+            with RunMetrics.stage("dedup", rows_in=len(df)) as st:
+                df = ...
+                st.rows_out = len(df)
+        """
+        handle = _StageHandle(rows_in)
+        metrics = cls._active
+        if metrics is None:
+            yield handle
+            return
+
+        if metrics.trace_memory:
+            metrics._push_traced_peak()
+        profiling = metrics._profiler is not None and name == metrics.profile_stage
+        if profiling:
+            metrics._profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                metrics._profiler.disable()
+            metrics._record(name, elapsed, handle)
+
+    def _record(self, name: str, elapsed: float, handle: _StageHandle):
+        key = (self.current_file, name)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = StageRecord(file=self.current_file, stage=name)
+        record.calls += 1
+        record.seconds += elapsed
+        record.add_rows('rows_in', handle.rows_in)
+        record.add_rows('rows_out', handle.rows_out)
+        record.peak_rss_mb = _peak_rss_mb()
+        if self.trace_memory:
+            traced_peak = round(self._pop_traced_peak() / (1024 * 1024), 1)
+            record.traced_peak_mb = max(record.traced_peak_mb or 0.0, traced_peak)
+
+    def _push_traced_peak(self):
+        import tracemalloc
+        if self._traced_peaks:
+            self._traced_peaks[-1] = max(self._traced_peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._traced_peaks.append(0)
+
+    def _pop_traced_peak(self) -> int:
+        import tracemalloc
+        peak = max(self._traced_peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self._traced_peaks:
+            self._traced_peaks[-1] = max(self._traced_peaks[-1], peak)
+        return peak
+
+    def merge(self, records):
+        """Incorpora registros vindos de outro processo (ex: --workers), no formato de to_dict()."""
+        for data in records:
+            data = {k: v for k, v in data.items() if k != 'rows_per_second'}
+            key = (data['file'], data['stage'])
+            record = self.records.get(key)
+            if record is None:
+                self.records[key] = StageRecord(**data)
+                continue
+            record.calls += data['calls']
+            record.seconds += data['seconds']
+            record.add_rows('rows_in', data['rows_in'])
+            record.add_rows('rows_out', data['rows_out'])
+            record.peak_rss_mb = max(filter(None, (record.peak_rss_mb, data['peak_rss_mb'])), default=None)
+            record.traced_peak_mb = max(filter(None, (record.traced_peak_mb, data['traced_peak_mb'])), default=None)
+
+    # ------------------------------------------------------------------
+    # Relatórios
+    # ------------------------------------------------------------------
+
+    def report(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "command": self.command,
+            "started_at": self.started_at.isoformat(timespec='seconds'),
+            "total_seconds": round(time.perf_counter() - self._start, 3),
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": [record.to_dict() for record in self.records.values()],
+        }
+
+    def write_report(self, directory: str) -> str:
+        """Grava o relatório JSON da execução em directory e retorna o caminho."""
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, f"run_{self.started_at:%Y%m%d_%H%M%S}_{self.run_id}.json")
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        return path
+
+    def write_prometheus(self, path: str):
+        """
+        Grava as métricas no formato texto do Prometheus (para o textfile collector do node_exporter).
+        A escrita é atômica para o coletor nunca ler um arquivo pela metade.
+        """
+        metrics = {
+            "dvs_etl_stage_seconds": ("gauge", "Tempo total da etapa na execução", lambda r: round(r.seconds, 6)),
+            "dvs_etl_stage_rows_in": ("gauge", "Linhas de entrada da etapa", lambda r: r.rows_in),
+            "dvs_etl_stage_rows_out": ("gauge", "Linhas de saída da etapa", lambda r: r.rows_out),
+            "dvs_etl_stage_rows_per_second": ("gauge", "Vazão da etapa", lambda r: r.rows_per_second),
+            "dvs_etl_stage_peak_rss_megabytes": ("gauge", "Pico de RSS do processo ao fim da etapa",
+                                                 lambda r: r.peak_rss_mb),
+        }
+        lines = []
+        for metric, (kind, help_text, getter) in metrics.items():
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for record in self.records.values():
+                value = getter(record)
+                if value is not None:
+                    file_label = record.file.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{file="{file_label}",stage="{record.stage}"}} {value}')
+        lines.append("# HELP dvs_etl_run_seconds Duração total da execução")
+        lines.append("# TYPE dvs_etl_run_seconds gauge")
+        lines.append(f"dvs_etl_run_seconds {time.perf_counter() - self._start:.3f}")
+        lines.append("# HELP dvs_etl_run_timestamp_seconds Início da execução (epoch)")
+        lines.append("# TYPE dvs_etl_run_timestamp_seconds gauge")
+        lines.append(f"dvs_etl_run_timestamp_seconds {self.started_at.timestamp():.0f}")
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def write_profile(self, directory: str) -> Optional[str]:
+        """Grava o cProfile acumulado da etapa escolhida em --profile (abrir com pstats ou snakeviz)."""
+        if self._profiler is None:
+            return None
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        path = os.path.join(directory, f"run_{self.started_at:%Y%m%d_%H%M%S}_{self.run_id}_{self.profile_stage}.prof")
+        self._profiler.dump_stats(path)
+        return path
+
+    def print_summary(self):
+        print("\nEtapas (tempo | linhas in -> out | linhas/s | pico RSS):")
+        for record in self.records.values():
+            label = f"{record.file}:{record.stage}" if record.file else record.stage
+            rate = f"{record.rows_per_second:,.0f}/s" if record.rows_per_second else "-"
+            rss = f"{record.peak_rss_mb} MB" if record.peak_rss_mb is not None else "-"
+            print(f" -> {label}: {record.seconds:.2f}s | {record.rows_in} -> {record.rows_out} | {rate} | {rss}")
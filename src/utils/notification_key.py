@@ -0,0 +1,98 @@
+import hashlib
+import re
+from typing import TYPE_CHECKING
+
+# numpy/pandas só são importados ao calcular a chave: o CLI importa este módulo pela constante da coluna
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Chave inteira de 64 bits que substitui (ID_AGRAVO, NU_NOTIFIC, NU_ANO) na deduplicação e no merge
+NOTIF_KEY_COLUMN = "NOTIF_KEY"
+
+# Layout (do bit mais significativo): agravo 16 | NU_ANO - 1900 8 | dígitos do NU_NOTIFIC 4 | NU_NOTIFIC 34.
+# O número de dígitos separa '0001234' de '1234'. Chaves empacotadas são >= 0; combinações que não cabem
+# no layout usam o hash MD5 do trio em valores negativos (colisão só entre essas linhas, ~2^-63 por par).
+_NUMBER_BITS = 34
+_YEAR_MIN, _YEAR_MAX = 1900, 2155
+_MAX_DIGITS = 10
+
+# CID-10 do agravo: letra, dois dígitos e subcategoria opcional, com ou sem ponto (A90, A92.0, A920)
+_AGRAVO_RE = re.compile(r"([A-Z])([0-9]{2})(?:(\.?)([0-9]))?")
+_NOTIFIC_RE = rf"[0-9]{{1,{_MAX_DIGITS}}}"
+
+
+def agravo_code(value) -> int:
+    """Código de 16 bits do agravo (letra x 100 + número, x 21 + subcategoria), ou -1 se não for um CID."""
+    match = _AGRAVO_RE.fullmatch(value) if isinstance(value, str) else None
+    if match is None:
+        return -1
+    letter, number, dot, sub = match.groups()
+    extra = 0 if sub is None else int(sub) + (1 if dot else 11)
+    return ((ord(letter) - 65) * 100 + int(number)) * 21 + extra
+
+
+def _fallback_key(agravo, notific, ano) -> int:
+    import pandas as pd
+
+    def part(value):
+        return "" if pd.isna(value) else str(value)
+
+    text = f"{part(agravo)}|{part(notific)}|{part(ano if pd.isna(ano) else int(ano))}"
+    return -(int(hashlib.md5(text.encode()).hexdigest()[:16], 16) & 0x7FFFFFFFFFFFFFFF) - 1
+
+
+def add_notification_key(df: "pd.DataFrame", column: str = NOTIF_KEY_COLUMN) -> "pd.DataFrame":
+    """
+    Acrescenta a chave empacotada de cada notificação (BIGINT com sinal).
+    O agravo é codificado uma vez por categoria; NU_NOTIFIC não numérico, com mais de 10 dígitos,
+    agravo fora do padrão CID ou ano fora de 1900-2155 caem no hash (mesma regra de notification_key_sql).
+    """
+    import numpy as np
+    import pandas as pd
+
+    agravo = df["ID_AGRAVO"]
+    if not isinstance(agravo.dtype, pd.CategoricalDtype):
+        agravo = agravo.astype('category')
+    # Código -1 (nulo) do Categorical aponta para o último item: inválido
+    codes_by_category = np.array([agravo_code(v) for v in agravo.cat.categories] + [-1], dtype=np.int64)
+    agravo_codes = codes_by_category[agravo.cat.codes.to_numpy()]
+
+    ano = pd.to_numeric(df["NU_ANO"], errors='coerce').astype('float64').to_numpy()
+    notific = df["NU_NOTIFIC"].fillna("").astype(str)
+    numeric = notific.str.fullmatch(_NOTIFIC_RE).to_numpy(dtype=bool)
+
+    valid = (agravo_codes >= 0) & (ano >= _YEAR_MIN) & (ano <= _YEAR_MAX) & numeric
+    digits = notific.str.len().to_numpy(dtype=np.int64)
+    # Conversão direta do numpy (já validada pela regex), bem mais rápida que pd.to_numeric
+    numbers = np.zeros(len(df), dtype=np.int64)
+    numbers[valid] = notific.to_numpy()[valid].astype(np.int64)
+    years = np.where(valid, ano, _YEAR_MIN).astype(np.int64) - _YEAR_MIN
+
+    keys = (((agravo_codes * 256 + years) * 16 + digits) << _NUMBER_BITS) + numbers
+
+    invalid = np.flatnonzero(~valid)
+    if len(invalid):
+        raw_agravo = df["ID_AGRAVO"].to_numpy()
+        raw_notific = df["NU_NOTIFIC"].to_numpy()
+        raw_ano = df["NU_ANO"].to_numpy()
+        keys[invalid] = [_fallback_key(raw_agravo[i], raw_notific[i], raw_ano[i]) for i in invalid]
+
+    df[column] = keys
+    return df
+
+
+def notification_key_sql() -> str:
+    """Mesma chave calculada no PostgreSQL (preenchimento de tabelas criadas antes da coluna)."""
+    agravo = '"ID_AGRAVO"::text'
+    notific = '"NU_NOTIFIC"::text'
+    sub = (f"CASE WHEN length({agravo}) = 3 THEN 0 "
+           f"WHEN substr({agravo}, 4, 1) = '.' THEN substr({agravo}, 5, 1)::bigint + 1 "
+           f"ELSE substr({agravo}, 4, 1)::bigint + 11 END")
+    packed = (f"(((((ascii({agravo}) - 65) * 100 + substr({agravo}, 2, 2)::bigint) * 21 + {sub}) * 256 "
+              f'+ ("NU_ANO"::bigint - {_YEAR_MIN})) * 16 + length({notific})) * {1 << _NUMBER_BITS} '
+              f"+ {notific}::bigint")
+    text = (f"concat(coalesce({agravo}, ''), '|', coalesce({notific}, ''), '|', "
+            f"coalesce(\"NU_ANO\"::bigint::text, ''))")
+    fallback = f"-((('x' || substr(md5({text}), 1, 16))::bit(64)::bigint) & 9223372036854775807) - 1"
+    return (f"CASE WHEN {agravo} ~ '^[A-Z][0-9]{{2}}(\\.?[0-9])?$' AND {notific} ~ '^{_NOTIFIC_RE}$' "
+            f'AND "NU_ANO" BETWEEN {_YEAR_MIN} AND {_YEAR_MAX} THEN {packed} ELSE {fallback} END')